@@ -0,0 +1,55 @@
+"""
+Review Script Helpers
+Document reading, keyword scanning, and requirement-ID patterns shared by the review scripts.
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional
+
+
+# A requirement ID such as FR-12. The bounds keep every script agreeing on
+# what counts as an ID and stop runaway matches on long letter/digit runs.
+REQ_ID = r"[A-Z]{2,8}-\d{1,6}"
+# Word-anchored ID patterns; definitions are IDs followed by ':'.
+REQ_ID_RE = re.compile(rf"\b{REQ_ID}(?=:)")
+REQ_REF_RE = re.compile(rf"\b{REQ_ID}\b")
+# Requirement IDs are ASCII, so source files can be scanned without decoding.
+REQ_REF_BYTES_RE = re.compile(rf"\b{REQ_ID}\b".encode("ascii"))
+
+
+def read_text(path: Path) -> str:
+    """Read a file with one unbuffered read and a single lenient UTF-8 decode."""
+    text = path.read_bytes().decode("utf-8", errors="replace")
+    # Match read_text()'s universal-newline translation.
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_optional(path: Optional[Path]) -> Optional[str]:
+    """Read path if it exists, using the open itself as the existence check."""
+    if path is None:
+        return None
+    try:
+        return read_text(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def keyword_re(keywords: List[str]) -> "re.Pattern[str]":
+    """Compile lowercase keywords into a single overlapping-match alternation."""
+    # The zero-width lookahead lets one finditer pass report overlapping
+    # keywords; keywords must not be prefixes of one another.
+    alternation = "|".join(re.escape(keyword.lower()) for keyword in keywords)
+    return re.compile(f"(?=({alternation}))")
+
+
+def line_offsets(content: str) -> List[int]:
+    """Return the starting offset of every line in content."""
+    offsets = [0]
+    index = content.find("\n")
+    while index != -1:
+        offsets.append(index + 1)
+        index = content.find("\n", index + 1)
+    return offsets
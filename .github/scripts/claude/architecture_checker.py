@@ -4,11 +4,14 @@ Architecture Document Checker
 Validates architecture documents for completeness and alignment with requirements.
 """
 
+import bisect
 import json
 import re
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any, Optional
+
+from _review_common import REQ_ID_RE, REQ_REF_RE, keyword_re, line_offsets, read_optional
 
 
 class ArchitectureChecker:
@@ -30,18 +33,57 @@ class ArchitectureChecker:
         "Event-Driven", "Layered", "Hexagonal", "Clean Architecture"
     ]
 
-    def __init__(self, arch_filepath: str, req_filepath: str = None):
-        self.arch_filepath = Path(arch_filepath)
-        self.req_filepath = Path(req_filepath) if req_filepath else None
-        self.arch_content = ""
-        self.req_content = ""
+    TECH_KEYWORDS = [
+        "database", "framework", "language", "library",
+        "server", "cloud", "container", "deployment"
+    ]
+
+    INCOMPLETE_INDICATORS = ["TBD", "TODO", "WIP", "???", "FIXME"]
+
+    DIAGRAM_INDICATORS = [
+        "```mermaid", "```plantuml", "```graphviz",
+        "![", "[diagram]", "[figure]", ".png", ".jpg", ".svg"
+    ]
+
+    _DIAGRAM_RE = re.compile("|".join(re.escape(indicator) for indicator in DIAGRAM_INDICATORS))
+    _INCOMPLETE_RE = re.compile("|".join(re.escape(indicator) for indicator in INCOMPLETE_INDICATORS))
+    _SECTION_RE = keyword_re(REQUIRED_SECTIONS)
+    _PATTERN_RE = keyword_re(ARCHITECTURE_PATTERNS)
+    _TECH_RE = keyword_re(TECH_KEYWORDS)
+
+    def __init__(
+        self,
+        arch_content: Optional[str],
+        req_content: Optional[str] = None,
+        *,
+        arch_filepath: Optional[Path] = None,
+        req_filepath: Optional[Path] = None,
+    ):
+        self.arch_filepath = arch_filepath
+        self.req_filepath = req_filepath
+        self._arch_missing = arch_content is None
+        self.arch_content = arch_content or ""
+        self._arch_lower = self.arch_content.lower()
+        self.req_content = req_content or ""
         self.issues = []
         self.suggestions = []
         self.alignment = 100
 
+    @classmethod
+    def from_paths(cls, arch_filepath: str, req_filepath: str = None) -> "ArchitectureChecker":
+        """Read the input documents once and build a checker from their content."""
+        arch_path = Path(arch_filepath)
+        req_path = Path(req_filepath) if req_filepath else None
+        return cls(
+            read_optional(arch_path),
+            read_optional(req_path),
+            arch_filepath=arch_path,
+            req_filepath=req_path,
+        )
+
     def validate(self) -> Dict[str, Any]:
         """Run all validation checks."""
-        if not self.arch_filepath.exists():
+        if self._arch_missing:
             return {
                 "passed": False,
                 "issues": [f"Architecture file not found: {self.arch_filepath}"],
@@ -49,11 +91,6 @@ class ArchitectureChecker:
                 "alignment": 0
             }
 
-        self.arch_content = self.arch_filepath.read_text()
-
-        if self.req_filepath and self.req_filepath.exists():
-            self.req_content = self.req_filepath.read_text()
-
         self._check_structure()
         self._check_completeness()
         self._check_design_patterns()
@@ -73,10 +110,11 @@ class ArchitectureChecker:
 
     def _check_structure(self):
         """Check if all required sections are present."""
-        missing_sections = []
-        for section in self.REQUIRED_SECTIONS:
-            if section.lower() not in self.arch_content.lower():
-                missing_sections.append(section)
+        found = {match.group(1) for match in self._SECTION_RE.finditer(self._arch_lower)}
+        missing_sections = [
+            section for section in self.REQUIRED_SECTIONS
+            if section.lower() not in found
+        ]
 
         if missing_sections:
             self.issues.append(
@@ -85,60 +123,42 @@ class ArchitectureChecker:
 
     def _check_completeness(self):
         """Check for incomplete sections."""
-        incomplete_indicators = ["TBD", "TODO", "WIP", "???", "FIXME"]
+        matches = list(self._INCOMPLETE_RE.finditer(self.arch_content))
+        if not matches:
+            return
 
-        for indicator in incomplete_indicators:
-            if indicator in self.arch_content:
-                lines = self.arch_content.split("\n")
-                for i, line in enumerate(lines, 1):
-                    if indicator in line:
-                        self.issues.append(
-                            f"Line {i}: Incomplete section contains '{indicator}'"
-                        )
+        offsets = line_offsets(self.arch_content)
+        seen = set()
+        for match in matches:
+            hit = (bisect.bisect_right(offsets, match.start()), match.group())
+            if hit in seen:
+                continue
+            seen.add(hit)
+            self.issues.append(
+                f"Line {hit[0]}: Incomplete section contains '{hit[1]}'"
+            )
 
     def _check_design_patterns(self):
         """Verify architectural patterns are documented."""
-        pattern_found = False
-        for pattern in self.ARCHITECTURE_PATTERNS:
-            if pattern.lower() in self.arch_content.lower():
-                pattern_found = True
-                break
-
-        if not pattern_found:
+        if not self._PATTERN_RE.search(self._arch_lower):
             self.suggestions.append(
                 "Consider explicitly stating the architectural pattern used"
             )
 
     def _check_technology_choices(self):
         """Validate technology stack documentation."""
-        tech_keywords = [
-            "database", "framework", "language", "library",
-            "server", "cloud", "container", "deployment"
-        ]
-
-        tech_coverage = sum(
-            1 for keyword in tech_keywords
-            if keyword in self.arch_content.lower()
+        tech_coverage = len(
+            {match.group(1) for match in self._TECH_RE.finditer(self._arch_lower)}
         )
 
-        if tech_coverage < len(tech_keywords) * 0.5:
+        if tech_coverage < len(self.TECH_KEYWORDS) * 0.5:
             self.suggestions.append(
                 "Technology stack documentation could be more comprehensive"
             )
 
     def _check_diagrams(self):
         """Check for architecture diagrams."""
-        diagram_indicators = [
-            "```mermaid", "```plantuml", "```graphviz",
-            "![", "[diagram]", "[figure]", ".png", ".jpg", ".svg"
-        ]
-
-        has_diagram = any(
-            indicator in self.arch_content
-            for indicator in diagram_indicators
-        )
-
-        if not has_diagram:
+        if not self._DIAGRAM_RE.search(self.arch_content):
             self.issues.append(
                 "No architecture diagrams found. Visual representations are required"
             )
@@ -146,24 +166,21 @@ class ArchitectureChecker:
     def _check_requirements_coverage(self):
         """Check if architecture covers all requirements."""
         # Extract requirement IDs from requirements document
-        req_pattern = re.compile(r"([A-Z]+-\d+):")
-        req_ids = req_pattern.findall(self.req_content)
+        req_ids = REQ_ID_RE.findall(self.req_content)
 
         if not req_ids:
             return
 
         # Check how many requirements are referenced in architecture
-        referenced = 0
-        for req_id in req_ids:
-            if req_id in self.arch_content:
-                referenced += 1
+        arch_ids = set(REQ_REF_RE.findall(self.arch_content))
+        referenced = sum(1 for req_id in req_ids if req_id in arch_ids)
 
         self.alignment = int((referenced / len(req_ids)) * 100) if req_ids else 100
 
         if self.alignment < 80:
             missing = [
                 req_id for req_id in req_ids
-                if req_id not in self.arch_content
+                if req_id not in arch_ids
             ]
             self.issues.append(
                 f"Low requirements coverage ({self.alignment}%). "
@@ -179,29 +196,31 @@ def main():
     arch_file = sys.argv[1]
     req_file = sys.argv[2] if len(sys.argv) > 2 else None
 
-    checker = ArchitectureChecker(arch_file, req_file)
+    checker = ArchitectureChecker.from_paths(arch_file, req_file)
     result = checker.validate()
 
     # Write results to JSON file
     with open("architecture_review.json", "w") as f:
-        json.dump(result, f, indent=2)
+        f.write(json.dumps(result))
 
     # Generate markdown report
+    parts = [
+        "### Architecture Validation Report\n\n",
+        f"**Status:** {'PASSED' if result['passed'] else 'FAILED'}\n",
+        f"**Requirements Alignment:** {result['alignment']}%\n\n",
+    ]
+
+    if result['issues']:
+        parts.append("**Issues:**\n")
+        parts.extend(f"- {issue}\n" for issue in result['issues'])
+        parts.append("\n")
+
+    if result['suggestions']:
+        parts.append("**Suggestions:**\n")
+        parts.extend(f"- {suggestion}\n" for suggestion in result['suggestions'])
+
     with open("architecture_report.md", "w") as f:
-        f.write("### Architecture Validation Report\n\n")
-        f.write(f"**Status:** {'PASSED' if result['passed'] else 'FAILED'}\n")
-        f.write(f"**Requirements Alignment:** {result['alignment']}%\n\n")
-
-        if result['issues']:
-            f.write("**Issues:**\n")
-            for issue in result['issues']:
-                f.write(f"- {issue}\n")
-            f.write("\n")
-
-        if result['suggestions']:
-            f.write("**Suggestions:**\n")
-            for suggestion in result['suggestions']:
-                f.write(f"- {suggestion}\n")
+        f.write("".join(parts))
 
     # Exit with appropriate code
     sys.exit(0 if result['passed'] else 1)
@@ -4,30 +4,92 @@ Implementation Plan Analyzer
 Validates implementation documents for completeness and feasibility.
 """
 
+import bisect
 import json
 import re
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from _review_common import keyword_re, line_offsets, read_optional
+
+
+# [^\S\n] is whitespace other than newline, so matches never span lines.
+_TASK_LINE_RE = re.compile(
+    r"^[^\S\n]*(?:\d+\.|-[^\S\n]+\[|Task[^\S\n]+\d+:|Step[^\S\n]+\d+:|Phase[^\S\n]+\d+:)",
+    re.MULTILINE,
+)
+_CODE_BLOCK_RE = re.compile(r"```[\w]*\n[\s\S]*?```")
+_INLINE_CODE_RE = re.compile(r"`[^`]+`")
+_COMPONENT_RE = re.compile(r"#{2,3}\s+([A-Z][A-Za-z\s]+Component|Service|Module|Layer)")
+_COMPONENT_RE_ALT = re.compile(r"(?:component|service|module|layer):\s*([A-Za-z]+)", re.IGNORECASE)
 
 
 class ImplementationAnalyzer:
     """Analyzes and validates implementation plans."""
 
-    def __init__(self, impl_file: str, arch_file: str = None, req_file: str = None):
-        self.impl_filepath = Path(impl_file)
-        self.arch_filepath = Path(arch_file) if arch_file else None
-        self.req_filepath = Path(req_file) if req_file else None
-        self.impl_content = ""
-        self.arch_content = ""
-        self.req_content = ""
+    DEPENDENCY_KEYWORDS = [
+        "depends on", "requires", "after", "before", "prerequisite"
+    ]
+
+    VAGUE_TERMS = [
+        "somehow", "maybe", "possibly", "might",
+        "figure out", "work out", "think about"
+    ]
+
+    DEPENDENCY_SECTIONS = [
+        "dependencies", "requirements", "prerequisites",
+        "libraries", "packages", "tools"
+    ]
+
+    COMPLEXITY_INDICATORS = [
+        "complex", "difficult", "challenging", "advanced",
+        "optimize", "refactor", "migrate", "integrate"
+    ]
+
+    _DEPENDENCY_LINE_RE = re.compile(
+        "^.*?(?:" + "|".join(re.escape(keyword) for keyword in DEPENDENCY_KEYWORDS) + ")",
+        re.MULTILINE,
+    )
+    _VAGUE_RE = keyword_re(VAGUE_TERMS)
+    _DEPENDENCY_SECTION_RE = keyword_re(DEPENDENCY_SECTIONS)
+    _COMPLEXITY_RE = keyword_re(COMPLEXITY_INDICATORS)
+
+    def __init__(
+        self,
+        impl_content: Optional[str],
+        arch_content: Optional[str] = None,
+        req_content: Optional[str] = None,
+        *,
+        impl_filepath: Optional[Path] = None,
+    ):
+        self.impl_filepath = impl_filepath
+        self._impl_missing = impl_content is None
+        self.impl_content = impl_content or ""
+        self._impl_lower = self.impl_content.lower()
+        self._impl_offsets = None
+        self.arch_content = arch_content or ""
+        self.req_content = req_content or ""
         self.issues = []
         self.tasks = {"total": 0, "effort": "Unknown", "dependencies": 0}
         self.coverage = {"percentage": 0, "missing": []}
 
+    @classmethod
+    def from_paths(
+        cls, impl_file: str, arch_file: str = None, req_file: str = None
+    ) -> "ImplementationAnalyzer":
+        """Read the input documents once and build an analyzer from their content."""
+        impl_path = Path(impl_file)
+        return cls(
+            read_optional(impl_path),
+            read_optional(Path(arch_file) if arch_file else None),
+            read_optional(Path(req_file) if req_file else None),
+            impl_filepath=impl_path,
+        )
+
     def analyze(self) -> Dict[str, Any]:
         """Run all analysis checks."""
-        if not self.impl_filepath.exists():
+        if self._impl_missing:
             return {
                 "passed": False,
                 "issues": [f"Implementation file not found: {self.impl_filepath}"],
@@ -35,14 +97,6 @@ class ImplementationAnalyzer:
                 "coverage": self.coverage
             }
 
-        self.impl_content = self.impl_filepath.read_text()
-
-        if self.arch_filepath and self.arch_filepath.exists():
-            self.arch_content = self.arch_filepath.read_text()
-
-        if self.req_filepath and self.req_filepath.exists():
-            self.req_content = self.req_filepath.read_text()
-
         self._analyze_tasks()
         self._check_code_examples()
         self._check_dependencies()
@@ -63,22 +117,7 @@ class ImplementationAnalyzer:
 
     def _analyze_tasks(self):
         """Analyze task breakdown in the implementation plan."""
-        # Look for task patterns
-        task_patterns = [
-            r"^\d+\.", r"^-\s+\[", r"^Task\s+\d+:",
-            r"^Step\s+\d+:", r"^Phase\s+\d+:"
-        ]
-
-        lines = self.impl_content.split("\n")
-        task_lines = []
-
-        for line in lines:
-            for pattern in task_patterns:
-                if re.match(pattern, line.strip()):
-                    task_lines.append(line.strip())
-                    break
-
-        self.tasks["total"] = len(task_lines)
+        self.tasks["total"] = sum(1 for _ in _TASK_LINE_RE.finditer(self.impl_content))
 
         if self.tasks["total"] < 3:
             self.issues.append(
@@ -86,17 +125,13 @@ class ImplementationAnalyzer:
             )
 
         # Check for task dependencies
-        dependency_keywords = ["depends on", "requires", "after", "before", "prerequisite"]
-        dependency_count = sum(
-            1 for line in lines
-            if any(keyword in line.lower() for keyword in dependency_keywords)
+        self.tasks["dependencies"] = sum(
+            1 for _ in self._DEPENDENCY_LINE_RE.finditer(self._impl_lower)
         )
-        self.tasks["dependencies"] = dependency_count
 
     def _check_code_examples(self):
         """Check for code examples and snippets."""
-        code_block_pattern = r"```[\w]*\n[\s\S]*?```"
-        code_blocks = re.findall(code_block_pattern, self.impl_content)
+        code_blocks = _CODE_BLOCK_RE.findall(self.impl_content)
 
         if len(code_blocks) < 2:
             self.issues.append(
@@ -104,8 +139,7 @@ class ImplementationAnalyzer:
             )
 
         # Check for inline code
-        inline_code_pattern = r"`[^`]+`"
-        inline_codes = re.findall(inline_code_pattern, self.impl_content)
+        inline_codes = _INLINE_CODE_RE.findall(self.impl_content)
 
         if len(inline_codes) < 5:
             self.issues.append(
@@ -114,17 +148,7 @@ class ImplementationAnalyzer:
 
     def _check_dependencies(self):
         """Check for external dependencies documentation."""
-        dependency_sections = [
-            "dependencies", "requirements", "prerequisites",
-            "libraries", "packages", "tools"
-        ]
-
-        has_dependencies = any(
-            section in self.impl_content.lower()
-            for section in dependency_sections
-        )
-
-        if not has_dependencies:
+        if not self._DEPENDENCY_SECTION_RE.search(self._impl_lower):
             self.issues.append(
                 "Implementation plan should document external dependencies"
             )
@@ -132,14 +156,8 @@ class ImplementationAnalyzer:
     def _estimate_effort(self):
         """Estimate implementation effort based on tasks."""
         # Simple heuristic based on task count and complexity indicators
-        complexity_indicators = [
-            "complex", "difficult", "challenging", "advanced",
-            "optimize", "refactor", "migrate", "integrate"
-        ]
-
-        complexity_score = sum(
-            1 for indicator in complexity_indicators
-            if indicator in self.impl_content.lower()
+        complexity_score = len(
+            {match.group(1) for match in self._COMPLEXITY_RE.finditer(self._impl_lower)}
         )
 
         if self.tasks["total"] <= 5:
@@ -155,19 +173,17 @@ class ImplementationAnalyzer:
     def _check_architecture_coverage(self):
         """Check if implementation covers all architecture components."""
         # Extract component names from architecture
-        component_pattern = r"#{2,3}\s+([A-Z][A-Za-z\s]+Component|Service|Module|Layer)"
-        arch_components = re.findall(component_pattern, self.arch_content)
+        arch_components = _COMPONENT_RE.findall(self.arch_content)
 
         if not arch_components:
             # Try alternative pattern
-            component_pattern = r"(?:component|service|module|layer):\s*([A-Za-z]+)"
-            arch_components = re.findall(component_pattern, self.arch_content, re.IGNORECASE)
+            arch_components = _COMPONENT_RE_ALT.findall(self.arch_content)
 
         if arch_components:
             covered = 0
             missing = []
             for component in arch_components:
-                if component.lower() in self.impl_content.lower():
+                if component.lower() in self._impl_lower:
                     covered += 1
                 else:
                     missing.append(component)
@@ -183,19 +199,26 @@ class ImplementationAnalyzer:
     def _validate_implementation_steps(self):
         """Validate implementation steps are clear and actionable."""
         # Check for vague instructions
-        vague_terms = [
-            "somehow", "maybe", "possibly", "might",
-            "figure out", "work out", "think about"
-        ]
-
-        lines = self.impl_content.split("\n")
-        for i, line in enumerate(lines, 1):
-            for term in vague_terms:
-                if term in line.lower():
+        hits_by_line = {}
+        for match in self._VAGUE_RE.finditer(self._impl_lower):
+            line = bisect.bisect_right(self._plan_line_offsets(), match.start())
+            hits_by_line.setdefault(line, set()).add(match.group(1))
+
+        for i, hits in hits_by_line.items():
+            for term in self.VAGUE_TERMS:
+                if term in hits:
                     self.issues.append(
                         f"Line {i}: Vague instruction contains '{term}'"
                     )
 
+    def _plan_line_offsets(self) -> List[int]:
+        """Return cached line-start offsets for the lowercased plan."""
+        # Offsets come from the lowercased text that the scanners search,
+        # since str.lower() can change the length of some characters.
+        if self._impl_offsets is None:
+            self._impl_offsets = line_offsets(self._impl_lower)
+        return self._impl_offsets
+
     def _calculate_complexity(self):
         """Calculate overall implementation complexity score."""
         score = 5  # Base score
@@ -228,12 +251,12 @@ def main():
     arch_file = sys.argv[2] if len(sys.argv) > 2 else None
     req_file = sys.argv[3] if len(sys.argv) > 3 else None
 
-    analyzer = ImplementationAnalyzer(impl_file, arch_file, req_file)
+    analyzer = ImplementationAnalyzer.from_paths(impl_file, arch_file, req_file)
     result = analyzer.analyze()
 
     # Write results to JSON file
     with open("implementation_review.json", "w") as f:
-        json.dump(result, f, indent=2)
+        f.write(json.dumps(result))
 
     # Exit with appropriate code
     sys.exit(0 if result['passed'] else 1)
@@ -71,9 +71,8 @@ class QualityScorer:
             return 15
 
         try:
-            covered_percentage = coverage.get("covered_percentage", 50)
-            return int(covered_percentage * 0.3)
-        except:
+            return int(coverage.get("covered_percentage", 50) * 0.3)
+        except (AttributeError, TypeError, ValueError, OverflowError):
             return 15
 
     def _calculate_documentation_score(self, report: Dict) -> int:
@@ -82,9 +81,8 @@ class QualityScorer:
             return 10
 
         try:
-            completeness = report.get("completeness", 50)
-            return int(completeness * 0.2)
-        except:
+            return int(report.get("completeness", 50) * 0.2)
+        except (AttributeError, TypeError, ValueError, OverflowError):
             return 10
 
     def _calculate_test_score(self, test_results: str) -> int:
@@ -93,12 +91,9 @@ class QualityScorer:
             return 15
 
         # Parse test results (simplified)
-        try:
-            # This is a simplified calculation
-            # In reality, you'd parse the actual test results XML/JSON
-            return 20  # Default moderate score
-        except:
-            return 15
+        # This is a simplified calculation
+        # In reality, you'd parse the actual test results XML/JSON
+        return 20  # Default moderate score
 
 
 def main():
@@ -114,14 +109,14 @@ def main():
     try:
         with open(sys.argv[1], 'r') as f:
             req_coverage = json.load(f)
-    except:
+    except (OSError, ValueError, RecursionError):
         req_coverage = {"covered_percentage": 50}
 
     if len(sys.argv) > 2:
         try:
             with open(sys.argv[2], 'r') as f:
                 doc_report = json.load(f)
-        except:
+        except (OSError, ValueError, RecursionError):
             doc_report = {"completeness": 50}
 
     if len(sys.argv) > 3:
@@ -133,7 +128,7 @@ def main():
 
     # Write output
     with open("quality_score.json", "w") as f:
-        json.dump(result, f, indent=2)
+        f.write(json.dumps(result))
 
     # Exit based on score
     sys.exit(0 if result["total_score"] >= 85 else 1)
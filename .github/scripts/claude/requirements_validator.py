@@ -4,11 +4,23 @@ Requirements Document Validator
 Validates that requirements follow RFC 2119 language and best practices.
 """
 
+import bisect
 import json
 import re
 import sys
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Any
+
+from _review_common import REQ_ID, keyword_re, line_offsets, read_text
+
+
+# [^\S\n] is whitespace other than newline, mirroring line.strip() per line.
+# A bullet needs text after "- ", as a stripped line cannot end in a space.
+_LIST_ITEM_RE = re.compile(r"^[^\S\n]*(?:- (?=.*\S)|\d+\.)", re.MULTILINE)
+_REQ_LINE_RE = re.compile(rf"^[^\S\n]*({REQ_ID}):", re.MULTILINE)
+_REQ_TYPE_RE = re.compile(r"^[^\S\n]*(FR|NFR|CON)-\d{1,6}:", re.MULTILINE)
+_DIGIT_RE = re.compile(r"\d")
 
 
 class RequirementsValidator:
@@ -27,9 +39,33 @@ class RequirementsValidator:
         "Acceptance Criteria"
     ]
 
+    VAGUE_TERMS = [
+        "user-friendly", "easy to use", "fast", "efficient",
+        "secure", "reliable", "scalable", "flexible"
+    ]
+
+    INCOMPLETE_INDICATORS = ["TBD", "TODO", "XXX", "???", "...", "etc"]
+
+    _SECTION_PROBES = [(section, section.lower()) for section in REQUIRED_SECTIONS]
+    _VAGUE_RE = keyword_re(VAGUE_TERMS)
+    _INCOMPLETE_RE = re.compile("|".join(re.escape(indicator) for indicator in INCOMPLETE_INDICATORS))
+    _RFC2119_RE = re.compile("|".join(re.escape(keyword) for keyword in RFC2119_KEYWORDS))
+    # Uppercase and lowercase spellings, longest first: the variant matched at a
+    # position names every keyword occurring there, since shorter ones are prefixes.
+    _RFC2119_CASED_RE = re.compile("(?=(" + "|".join(
+        re.escape(variant) for variant in sorted(
+            {*RFC2119_KEYWORDS, *(keyword.lower() for keyword in RFC2119_KEYWORDS)},
+            key=len, reverse=True,
+        )
+    ) + "))")
+
     def __init__(self, filepath: str):
         self.filepath = Path(filepath)
         self.content = ""
+        self._lines = []
+        self._content_lower = ""
+        self._line_starts = []
+        self._keyword_hits = Counter()
         self.issues = []
         self.warnings = []
         self.stats = {}
@@ -44,7 +80,11 @@ class RequirementsValidator:
                 "stats": {}
             }
 
-        self.content = self.filepath.read_text()
+        self.content = read_text(self.filepath)
+        # Split, lowercase and index lines once; every check below shares these.
+        self._lines = self.content.split("\n")
+        self._content_lower = self.content.lower()
+        self._line_starts = line_offsets(self.content)
 
         self._check_structure()
         self._check_rfc2119_usage()
@@ -64,102 +104,117 @@ class RequirementsValidator:
 
     def _check_structure(self):
         """Check if all required sections are present."""
-        for section in self.REQUIRED_SECTIONS:
-            if section.lower() not in self.content.lower():
+        for section, probe in self._SECTION_PROBES:
+            if probe not in self._content_lower:
                 self.issues.append(f"Missing required section: {section}")
 
     def _check_rfc2119_usage(self):
         """Verify proper use of RFC 2119 keywords."""
-        lines = self.content.split("\n")
-        requirement_lines = [
-            (i, line) for i, line in enumerate(lines, 1)
-            if line.strip().startswith("- ") or re.match(r"^\d+\.", line.strip())
-        ]
-
-        for line_num, line in requirement_lines:
-            has_keyword = any(keyword in line.upper() for keyword in self.RFC2119_KEYWORDS)
-            if not has_keyword:
+        for match in _LIST_ITEM_RE.finditer(self.content):
+            line_num = bisect.bisect_right(self._line_starts, match.start())
+            line = self._lines[line_num - 1]
+            if not self._RFC2119_RE.search(line.upper()):
                 self.warnings.append(
                     f"Line {line_num}: Requirement lacks RFC 2119 keyword: {line[:50]}..."
                 )
 
         # Check for lowercase RFC 2119 keywords
+        self._keyword_hits = Counter(
+            match.group(1) for match in self._RFC2119_CASED_RE.finditer(self.content)
+        )
         for keyword in self.RFC2119_KEYWORDS:
-            if keyword.lower() in self.content and keyword not in self.content:
+            lowercase = keyword.lower()
+            if (any(lowercase in hit for hit in self._keyword_hits)
+                    and not any(keyword in hit for hit in self._keyword_hits)):
                 self.warnings.append(
                     f"RFC 2119 keyword '{keyword}' should be uppercase"
                 )
 
     def _check_requirement_format(self):
         """Check requirement formatting and numbering."""
-        lines = self.content.split("\n")
-        req_pattern = re.compile(r"^[A-Z]+-\d+:")
-
-        requirements = []
-        for i, line in enumerate(lines, 1):
-            if req_pattern.match(line.strip()):
-                requirements.append((i, line.strip()))
+        ids = _REQ_LINE_RE.findall(self.content)
 
         # Check for unique IDs
-        ids = [req[1].split(":")[0] for req in requirements]
-        duplicates = [id for id in ids if ids.count(id) > 1]
+        duplicates = {id for id, count in Counter(ids).items() if count > 1}
         if duplicates:
-            self.issues.append(f"Duplicate requirement IDs found: {set(duplicates)}")
+            self.issues.append(f"Duplicate requirement IDs found: {duplicates}")
 
         # Check for missing requirements in sequence
         for prefix in ["FR", "NFR", "CON"]:
             prefix_reqs = [id for id in ids if id.startswith(prefix)]
             if prefix_reqs:
-                numbers = [int(id.split("-")[1]) for id in prefix_reqs]
-                expected = set(range(1, max(numbers) + 1))
-                actual = set(numbers)
-                missing = expected - actual
+                # Walk the sorted numbers once and collect the gaps between them
+                missing = []
+                previous = 0
+                for number in sorted({int(id.partition("-")[2]) for id in prefix_reqs}):
+                    if number > previous + 1:
+                        missing.extend(range(previous + 1, number))
+                    previous = number
                 if missing:
                     self.warnings.append(
-                        f"Missing {prefix} requirements: {sorted(missing)}"
+                        f"Missing {prefix} requirements: {missing}"
                     )
 
     def _check_testability(self):
         """Ensure requirements are testable."""
-        vague_terms = [
-            "user-friendly", "easy to use", "fast", "efficient",
-            "secure", "reliable", "scalable", "flexible"
-        ]
-
-        lines = self.content.split("\n")
-        for i, line in enumerate(lines, 1):
-            for term in vague_terms:
-                if term in line.lower() and not re.search(r"\d+", line):
+        matches = list(self._VAGUE_RE.finditer(self._content_lower))
+        if not matches:
+            return
+
+        # lower() never shrinks a character, so equal lengths mean the line
+        # starts line up; otherwise recompute them on the lowercased text.
+        if len(self._content_lower) == len(self.content):
+            offsets = self._line_starts
+        else:
+            offsets = line_offsets(self._content_lower)
+        hits_by_line = {}
+        for match in matches:
+            line = bisect.bisect_right(offsets, match.start())
+            hits_by_line.setdefault(line, set()).add(match.group(1))
+
+        line_starts = self._line_starts
+        for i, hits in hits_by_line.items():
+            # Bound the digit search to the line's span of the document.
+            end = line_starts[i] - 1 if i < len(line_starts) else len(self.content)
+            if _DIGIT_RE.search(self.content, line_starts[i - 1], end):
+                continue
+            for term in self.VAGUE_TERMS:
+                if term in hits:
                     self.warnings.append(
                         f"Line {i}: Vague term '{term}' without measurable criteria"
                     )
 
     def _check_completeness(self):
         """Check for incomplete requirements."""
-        incomplete_indicators = ["TBD", "TODO", "XXX", "???", "...", "etc"]
-
-        for indicator in incomplete_indicators:
-            if indicator in self.content:
-                lines = self.content.split("\n")
-                for i, line in enumerate(lines, 1):
-                    if indicator in line:
-                        self.issues.append(
-                            f"Line {i}: Incomplete requirement contains '{indicator}'"
-                        )
+        # No indicator can start inside another's match, so a non-overlapping
+        # scan still sees every (line, indicator) pair.
+        lines_by_indicator = {}
+        for match in self._INCOMPLETE_RE.finditer(self.content):
+            line = bisect.bisect_right(self._line_starts, match.start())
+            lines_by_indicator.setdefault(match.group(), set()).add(line)
+
+        for indicator in self.INCOMPLETE_INDICATORS:
+            for line in sorted(lines_by_indicator.get(indicator, ())):
+                self.issues.append(
+                    f"Line {line}: Incomplete requirement contains '{indicator}'"
+                )
 
     def _gather_statistics(self):
         """Gather statistics about the requirements."""
-        lines = self.content.split("\n")
-
-        # Count requirements by type
-        functional = len([l for l in lines if re.match(r"^FR-\d+:", l.strip())])
-        non_functional = len([l for l in lines if re.match(r"^NFR-\d+:", l.strip())])
-        constraints = len([l for l in lines if re.match(r"^CON-\d+:", l.strip())])
-
-        # Count RFC 2119 keywords
-        keyword_counts = {}
-        for keyword in self.RFC2119_KEYWORDS:
-            keyword_counts[keyword] = self.content.count(keyword)
+        # Count requirements by type in one pass over the document
+        type_counts = Counter(match.group(1) for match in _REQ_TYPE_RE.finditer(self.content))
+        functional = type_counts["FR"]
+        non_functional = type_counts["NFR"]
+        constraints = type_counts["CON"]
+
+        # Count RFC 2119 keywords from the scan done by _check_rfc2119_usage;
+        # each hit also counts every keyword that is a prefix of it.
+        keyword_counts = {
+            keyword: sum(
+                count for hit, count in self._keyword_hits.items() if hit.startswith(keyword)
+            )
+            for keyword in self.RFC2119_KEYWORDS
+        }
 
         self.stats = {
             "total_requirements": functional + non_functional + constraints,
@@ -167,7 +222,7 @@ class RequirementsValidator:
             "non_functional_requirements": non_functional,
             "constraints": constraints,
             "rfc2119_keywords": keyword_counts,
-            "document_lines": len(lines),
+            "document_lines": len(self._lines),
             "document_words": len(self.content.split())
         }
 
@@ -182,31 +237,35 @@ def main():
 
     # Write results to JSON file
     with open("review_output.json", "w") as f:
-        json.dump(result, f, indent=2)
+        f.write(json.dumps(result))
 
     # Generate markdown report
+    parts = [
+        "### Requirements Validation Report\n\n",
+        f"**Status:** {'PASSED' if result['passed'] else 'FAILED'}\n\n",
+    ]
+
+    if result['issues']:
+        parts.append("**Issues:**\n")
+        parts.extend(f"- {issue}\n" for issue in result['issues'])
+        parts.append("\n")
+
+    if result['warnings']:
+        parts.append("**Warnings:**\n")
+        parts.extend(f"- {warning}\n" for warning in result['warnings'])
+        parts.append("\n")
+
+    if result['stats']:
+        parts.extend([
+            "**Statistics:**\n",
+            f"- Total Requirements: {result['stats'].get('total_requirements', 0)}\n",
+            f"- Functional: {result['stats'].get('functional_requirements', 0)}\n",
+            f"- Non-Functional: {result['stats'].get('non_functional_requirements', 0)}\n",
+            f"- Constraints: {result['stats'].get('constraints', 0)}\n",
+        ])
+
     with open("requirements_report.md", "w") as f:
-        f.write("### Requirements Validation Report\n\n")
-        f.write(f"**Status:** {'PASSED' if result['passed'] else 'FAILED'}\n\n")
-
-        if result['issues']:
-            f.write("**Issues:**\n")
-            for issue in result['issues']:
-                f.write(f"- {issue}\n")
-            f.write("\n")
-
-        if result['warnings']:
-            f.write("**Warnings:**\n")
-            for warning in result['warnings']:
-                f.write(f"- {warning}\n")
-            f.write("\n")
-
-        if result['stats']:
-            f.write("**Statistics:**\n")
-            f.write(f"- Total Requirements: {result['stats'].get('total_requirements', 0)}\n")
-            f.write(f"- Functional: {result['stats'].get('functional_requirements', 0)}\n")
-            f.write(f"- Non-Functional: {result['stats'].get('non_functional_requirements', 0)}\n")
-            f.write(f"- Constraints: {result['stats'].get('constraints', 0)}\n")
+        f.write("".join(parts))
 
     # Exit with appropriate code
     sys.exit(0 if result['passed'] else 1)
@@ -4,40 +4,78 @@ Traceability Matrix Generator
 Creates a matrix showing how requirements map to architecture, implementation, and code.
 """
 
+import os
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterator, List, Set, Tuple
 
+from _review_common import REQ_ID_RE, REQ_REF_BYTES_RE, REQ_REF_RE, read_text
 
-def extract_requirement_ids(content: str) -> List[str]:
-    """Extract requirement IDs from content."""
-    pattern = re.compile(r"([A-Z]+-\d+):")
-    return pattern.findall(content)
 
+_SOURCE_SUFFIXES = (".py", ".js", ".ts", ".java", ".cpp", ".c")
+_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
-def find_references(content: str, req_id: str) -> bool:
-    """Check if a requirement ID is referenced in content."""
-    return req_id in content
 
-
-def scan_code_files(src_dir: Path, req_id: str) -> List[str]:
-    """Scan source code for requirement references."""
-    files_with_reference = []
+def extract_requirement_ids(content: str) -> List[str]:
+    """Extract requirement IDs from content."""
+    return REQ_ID_RE.findall(content)
+
+
+def find_references(content: str) -> Set[str]:
+    """Collect every requirement ID referenced in content."""
+    return set(REQ_REF_RE.findall(content))
+
+
+def iter_source_files(src_dir: Path) -> Iterator[str]:
+    """Yield source file paths under src_dir, skipping non-source entries early."""
+    stack = [str(src_dir)]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        subdirs = []
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(_SOURCE_SUFFIXES) and entry.is_file():
+                    yield entry.path
+        # Push in reverse so subdirectories pop in scan order, matching rglob's pre-order walk.
+        stack.extend(reversed(subdirs))
+
+
+def _scan_source_file(file_path: str) -> Tuple[str, Set[str]]:
+    """Read one source file and return the requirement IDs it references."""
+    try:
+        data = Path(file_path).read_bytes()
+    except OSError:
+        return file_path, set()
+    return file_path, {ref.decode("ascii") for ref in set(REQ_REF_BYTES_RE.findall(data))}
+
+
+def build_code_index(src_dir: Path, req_ids: Set[str]) -> Dict[str, List[str]]:
+    """Map each requirement ID to the source files that reference it."""
+    index: Dict[str, List[str]] = {req_id: [] for req_id in req_ids}
 
     if not src_dir.exists():
-        return files_with_reference
+        return index
+
+    # Imported lazily: concurrent.futures pulls in logging and threading,
+    # which dominates startup when there is no source tree to scan.
+    from concurrent.futures import ThreadPoolExecutor
 
-    for file_path in src_dir.rglob("*"):
-        if file_path.is_file() and file_path.suffix in [".py", ".js", ".ts", ".java", ".cpp", ".c"]:
-            try:
-                content = file_path.read_text()
-                if req_id in content:
-                    files_with_reference.append(str(file_path.relative_to(src_dir)))
-            except:
-                pass
+    # File reads release the GIL, so threads overlap IO with scanning;
+    # map() keeps results in walk order for a deterministic matrix.
+    with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+        for file_path, refs in executor.map(_scan_source_file, iter_source_files(src_dir)):
+            relative = os.path.relpath(file_path, src_dir)
+            for req_id in refs & req_ids:
+                index[req_id].append(relative)
 
-    return files_with_reference
+    return index
 
 
 def generate_matrix(req_file: str, arch_file: str, impl_file: str, src_dir: str):
@@ -48,9 +86,9 @@ def generate_matrix(req_file: str, arch_file: str, impl_file: str, src_dir: str)
     src_path = Path(src_dir)
 
     # Read content
-    req_content = req_path.read_text() if req_path.exists() else ""
-    arch_content = arch_path.read_text() if arch_path.exists() else ""
-    impl_content = impl_path.read_text() if impl_path.exists() else ""
+    req_content = read_text(req_path) if req_path.exists() else ""
+    arch_content = read_text(arch_path) if arch_path.exists() else ""
+    impl_content = read_text(impl_path) if impl_path.exists() else ""
 
     # Extract requirement IDs
     req_ids = extract_requirement_ids(req_content)
@@ -60,9 +98,15 @@ def generate_matrix(req_file: str, arch_file: str, impl_file: str, src_dir: str)
         return
 
     # Generate matrix header
-    print("# Requirements Traceability Matrix\n")
-    print("| Requirement ID | Description | Architecture | Implementation | Code Files | Status |")
-    print("|----------------|-------------|--------------|----------------|------------|--------|")
+    lines = [
+        "# Requirements Traceability Matrix\n",
+        "| Requirement ID | Description | Architecture | Implementation | Code Files | Status |",
+        "|----------------|-------------|--------------|----------------|------------|--------|",
+    ]
+
+    arch_refs = find_references(arch_content)
+    impl_refs = find_references(impl_content)
+    code_index = build_code_index(src_path, set(req_ids))
 
     total_reqs = len(req_ids)
     fully_traced = 0
@@ -73,11 +117,11 @@ def generate_matrix(req_file: str, arch_file: str, impl_file: str, src_dir: str)
         description = desc_match.group(1).strip()[:50] if desc_match else "N/A"
 
         # Check presence in each artifact
-        in_arch = "PASS" if find_references(arch_content, req_id) else "FAIL"
-        in_impl = "PASS" if find_references(impl_content, req_id) else "FAIL"
+        in_arch = "PASS" if req_id in arch_refs else "FAIL"
+        in_impl = "PASS" if req_id in impl_refs else "FAIL"
 
         # Check in code
-        code_files = scan_code_files(src_path, req_id)
+        code_files = code_index[req_id]
         in_code = ", ".join(code_files[:3]) if code_files else "FAIL"
 
         # Determine status
@@ -89,14 +133,17 @@ def generate_matrix(req_file: str, arch_file: str, impl_file: str, src_dir: str)
         else:
             status = "MISSING"
 
-        print(f"| {req_id} | {description} | {in_arch} | {in_impl} | {in_code} | {status} |")
+        lines.append(f"| {req_id} | {description} | {in_arch} | {in_impl} | {in_code} | {status} |")
 
     # Summary
     coverage = (fully_traced / total_reqs * 100) if total_reqs > 0 else 0
-    print(f"\n## Summary\n")
-    print(f"- **Total Requirements:** {total_reqs}")
-    print(f"- **Fully Traced:** {fully_traced}")
-    print(f"- **Coverage:** {coverage:.1f}%")
+    lines.extend([
+        "\n## Summary\n",
+        f"- **Total Requirements:** {total_reqs}",
+        f"- **Fully Traced:** {fully_traced}",
+        f"- **Coverage:** {coverage:.1f}%",
+    ])
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
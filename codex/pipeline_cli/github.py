@@ -1,18 +1,28 @@
 """Git and GitHub integration helpers for the Codex pipeline."""
 from __future__ import annotations
 
+import base64
 import json
 import os
 import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from http import client as http_client
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence
-from urllib import error, request
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib import request
+from urllib.parse import unquote, urljoin, urlsplit
 
 from .state import GitHubSettings, PipelineState
 from .stages import STAGE_ORDER
 
+try:  # pragma: no cover - optional faster JSON codec
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the standard library
+    orjson = None
+
 
 class GitIntegrationError(RuntimeError):
     """Raised when git or GitHub operations cannot be completed."""
@@ -54,11 +64,22 @@ def _current_branch(root: Path) -> str:
     return branch
 
 
-def _default_remote(root: Path) -> str:
-    remotes = _run_git(["remote"], root=root).stdout.strip().splitlines()
+def _remote_urls(root: Path) -> Dict[str, str]:
+    """Map each configured remote to its fetch URL using a single git call."""
+    urls: Dict[str, str] = {}
+    for line in _run_git(["remote", "-v"], root=root).stdout.splitlines():
+        name, _, rest = line.partition("\t")
+        # Partial clones append the filter, e.g. "<url> (fetch) [blob:none]".
+        url, marker, _ = rest.rpartition(" (fetch)")
+        if marker:
+            urls.setdefault(name, url)
+    return urls
+
+
+def _default_remote(remotes: Sequence[str]) -> str:
     if not remotes:
         raise GitIntegrationError("No git remotes configured. Add a GitHub remote first.")
-    return remotes[0].strip()
+    return remotes[0]
 
 
 def _remote_url(root: Path, remote: str) -> str:
@@ -82,6 +103,18 @@ def _parse_repository_slug(url: str) -> str:
     return slug
 
 
+def remote_repository(root: Path, remote: str) -> Optional[str]:
+    """Return the owner/name slug the remote points at, or None if it cannot be resolved."""
+
+    result = _run_git(["remote", "get-url", remote], root=root, check=False)
+    if result.returncode != 0:
+        return None
+    try:
+        return _parse_repository_slug(result.stdout)
+    except GitIntegrationError:
+        return None
+
+
 def prepare_github_settings(
     root: Path,
     *,
@@ -93,14 +126,15 @@ def prepare_github_settings(
     """Resolve git metadata and create a GitHubSettings instance."""
 
     _ensure_git_repo(root)
-    resolved_remote = remote or _default_remote(root)
-    remotes = _run_git(["remote"], root=root).stdout.splitlines()
-    if resolved_remote not in remotes:
+    remote_urls = _remote_urls(root)
+    remotes = list(remote_urls)
+    resolved_remote = remote or _default_remote(remotes)
+    if resolved_remote not in remote_urls:
         raise GitIntegrationError(f"Remote '{resolved_remote}' not found. Available remotes: {', '.join(remotes)}")
 
     resolved_branch = branch or _current_branch(root)
     resolved_base = base or "main"
-    repository = _parse_repository_slug(_remote_url(root, resolved_remote))
+    repository = _parse_repository_slug(remote_urls[resolved_remote])
     return GitHubSettings(
         remote=resolved_remote,
         branch=resolved_branch,
@@ -110,9 +144,21 @@ def prepare_github_settings(
     )
 
 
+def _has_staged_changes(root: Path) -> bool:
+    # One status call both proves we are in a work tree and lists index changes.
+    result = _run_git(["status", "--porcelain=v2", "--untracked-files=no"], root=root, check=False)
+    if result.returncode != 0:
+        raise GitIntegrationError("Not inside a git repository. Initialize git before enabling GitHub sync.")
+    for line in result.stdout.splitlines():
+        kind, _, rest = line.partition(" ")
+        # Ordinary/renamed entries carry the index status first; unmerged entries always count.
+        if kind == "u" or (kind in ("1", "2") and rest[:1] != "."):
+            return True
+    return False
+
+
 def _require_clean_index(root: Path) -> None:
-    staged = _run_git(["diff", "--cached", "--name-only"], root=root).stdout.strip()
-    if staged:
+    if _has_staged_changes(root):
         raise GitIntegrationError(
             "Cannot auto-sync while other files are staged. Commit or unstage them before proceeding."
         )
@@ -120,26 +166,20 @@ def _require_clean_index(root: Path) -> None:
 
 def _relative_paths(root: Path, paths: Iterable[Path]) -> List[Path]:
     rel_paths: List[Path] = []
+    resolved_root = root.resolve()
     for path in paths:
         if not path:
             continue
         try:
-            rel_paths.append(path.resolve().relative_to(root.resolve()))
+            rel_paths.append(path.resolve().relative_to(resolved_root))
         except ValueError:
             raise GitIntegrationError(f"Path '{path}' is outside the repository root and cannot be staged.")
     return rel_paths
 
 
-def _unstage(root: Path, rel_paths: Sequence[Path]) -> None:
-    if not rel_paths:
-        return
-    _run_git(["reset", "HEAD", *[str(p) for p in rel_paths]], root=root)
-
-
-def _commit_and_push(
+def _commit_stage(
     *,
     root: Path,
-    settings: GitHubSettings,
     stage_key: str,
     stage_title: str,
     tracked_paths: Sequence[Path],
@@ -147,19 +187,18 @@ def _commit_and_push(
     _require_clean_index(root)
 
     rel_paths = _relative_paths(root, tracked_paths)
-    for rel_path in rel_paths:
-        _run_git(["add", str(rel_path)], root=root)
+    if rel_paths:
+        _run_git(["add", "--", *[str(p) for p in rel_paths]], root=root)
 
+    # The index was clean before staging, so a quiet diff means it still
+    # matches HEAD and there is nothing to unstage.
     diff_check = _run_git(["diff", "--cached", "--quiet"], root=root, check=False)
     if diff_check.returncode == 0:
-        _unstage(root, rel_paths)
         return None
 
     commit_message = f"codex({stage_key}): sync {stage_title}"
-    _run_git(["commit", "-m", commit_message], root=root)
-    commit_sha = _run_git(["rev-parse", "HEAD"], root=root).stdout.strip()
-    _run_git(["push", settings.remote, settings.branch], root=root)
-    return commit_sha
+    _run_git(["commit", "--quiet", "-m", commit_message], root=root)
+    return _run_git(["rev-parse", "HEAD"], root=root).stdout.strip()
 
 
 def _github_token() -> Optional[str]:
@@ -170,46 +209,168 @@ def _github_token() -> Optional[str]:
     return None
 
 
+# Idle keep-alive connections reused across API calls, keyed by host. Each
+# request checks one out, so concurrent requests never share a socket.
+_IDLE_CONNECTIONS: Dict[str, List[http_client.HTTPSConnection]] = {}
+_POOL_LOCK = threading.Lock()
+_HTTP_CACHE_LOCK = threading.Lock()
+# Check-run URLs embed the commit SHA, so the ETag cache keeps only the most
+# recently stored responses instead of one entry per commit ever inspected.
+_HTTP_CACHE_MAX_ENTRIES = 12
+
+# Methods that are safe to resend when a reused connection turns out to be stale.
+_RETRYABLE_METHODS = {"GET", "PATCH"}
+# GitHub answers these for renamed or transferred repositories.
+_REDIRECT_STATUSES = {301, 302, 307, 308}
+
+
+def _json_loads(text: str | bytes) -> object:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _json_dumps_bytes(data: object) -> bytes:
+    return orjson.dumps(data) if orjson is not None else json.dumps(data).encode("utf-8")
+
+
+def _http_cache_path(root: Path) -> Path:
+    return root / ".codex_pipeline" / "http_cache.json"
+
+
+def _load_http_cache(path: Path) -> Dict[str, dict]:
+    try:
+        data = _json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _store_http_cache(path: Path, url: str, entry: dict) -> None:
+    # Reload under the lock so concurrent requests do not drop each other's entries.
+    with _HTTP_CACHE_LOCK:
+        cache = _load_http_cache(path)
+        # Re-insert so dict order tracks recency, then evict the oldest entries.
+        cache.pop(url, None)
+        cache[url] = entry
+        for stale in list(cache)[:-_HTTP_CACHE_MAX_ENTRIES]:
+            del cache[stale]
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(_json_dumps_bytes(cache))
+        except OSError:
+            pass
+
+
+def _checkout_connection(host: str) -> http_client.HTTPSConnection:
+    with _POOL_LOCK:
+        idle = _IDLE_CONNECTIONS.get(host)
+        if idle:
+            return idle.pop()
+    # Honor HTTPS_PROXY the way urlopen did, tunnelling through the proxy.
+    proxy = request.getproxies().get("https")
+    if proxy and not request.proxy_bypass(host):
+        proxy_parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        connection = http_client.HTTPSConnection(proxy_parts.hostname, proxy_parts.port or 80)
+        tunnel_headers = {}
+        if proxy_parts.username is not None:
+            credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+            token = base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+            tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+        connection.set_tunnel(host, headers=tunnel_headers)
+        return connection
+    return http_client.HTTPSConnection(host)
+
+
+def _release_connection(host: str, connection: http_client.HTTPSConnection) -> None:
+    with _POOL_LOCK:
+        _IDLE_CONNECTIONS.setdefault(host, []).append(connection)
+
+
+def _send_request(
+    method: str, url: str, payload: Optional[bytes], headers: Dict[str, str]
+) -> tuple[http_client.HTTPResponse, str]:
+    parts = urlsplit(url)
+    target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    while True:
+        connection = _checkout_connection(parts.netloc)
+        reused = connection.sock is not None
+        try:
+            connection.request(method, target, body=payload, headers=headers)
+            resp = connection.getresponse()
+            text = resp.read().decode("utf-8")
+        except (http_client.HTTPException, ConnectionError):
+            connection.close()
+            # GitHub drops idle keep-alive sockets; resend once on a fresh one.
+            if reused and method in _RETRYABLE_METHODS:
+                continue
+            raise
+        _release_connection(parts.netloc, connection)
+        return resp, text
+
+
 def _github_request(
     *,
     token: str,
     method: str,
     url: str,
     data: Optional[dict] = None,
+    cache_path: Optional[Path] = None,
 ) -> object:
     payload = None
-    if data is not None:
-        payload = json.dumps(data).encode("utf-8")
     headers = {
         "Authorization": f"Bearer {token}",
         "Accept": "application/vnd.github+json",
         "User-Agent": "codex-pipeline-cli",
     }
-    req = request.Request(url, data=payload, headers=headers, method=method)
-    try:
-        with request.urlopen(req) as resp:
-            text = resp.read().decode("utf-8")
-    except error.HTTPError as exc:  # pragma: no cover - network error handling
-        detail = exc.read().decode("utf-8") if exc.fp else exc.reason
-        raise GitIntegrationError(f"GitHub API request failed: {exc.code} {detail}") from exc
-    return json.loads(text) if text else None
+    if data is not None:
+        payload = _json_dumps_bytes(data)
+        headers["Content-Type"] = "application/json"
+    # GETs given a cache_path are made conditional on the ETag stored for the URL.
+    conditional = cache_path is not None and method == "GET"
+    cached = _load_http_cache(cache_path).get(url) if conditional else None
+    if isinstance(cached, dict) and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    resp, text = _send_request(method, url, payload, headers)
+    location = resp.getheader("Location")
+    if resp.status in _REDIRECT_STATUSES and location:
+        # Follow one redirect as urlopen did, keeping the method and body.
+        redirect_url = urljoin(url, location)
+        if urlsplit(redirect_url).netloc != urlsplit(url).netloc:
+            headers = {key: value for key, value in headers.items() if key != "Authorization"}
+        resp, text = _send_request(method, redirect_url, payload, headers)
+    if resp.status == 304 and isinstance(cached, dict):
+        # Not Modified: reuse the stored body; this does not count against the rate limit.
+        text = cached.get("body", "")
+        return _json_loads(text) if text else None
+    if not 200 <= resp.status < 300:  # pragma: no cover - network error handling
+        detail = text or resp.reason
+        raise GitIntegrationError(f"GitHub API request failed: {resp.status} {detail}")
+    etag = resp.getheader("ETag")
+    if conditional and etag:
+        _store_http_cache(cache_path, url, {"etag": etag, "body": text})
+    return _json_loads(text) if text else None
+
+
+_PR_TABLE_HEADER = "| Stage | Status | Notes |\n|-------|--------|-------|"
+_PR_TABLE_ROW = "| `{}` | {} | {} |".format
 
 
 def _render_pr_body(state: PipelineState) -> str:
-    lines = [
-        f"# Codex Pipeline Progress — {state.project_name}",
-        "",
-        "| Stage | Status | Notes |",
-        "|-------|--------|-------|",
-    ]
+    notes = state.stage_notes
+    rows = []
     for stage in STAGE_ORDER:
-        status = state.get_status(stage)
-        note = state.stage_notes.get(stage, "")
-        safe_note = note.replace("|", "\\|") if note else ""
-        lines.append(f"| `{stage}` | {status} | {safe_note} |")
+        note = notes.get(stage) or ""
+        if "|" in note:
+            note = note.replace("|", "\\|")
+        rows.append(_PR_TABLE_ROW(stage, state.get_status(stage), note))
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    lines.extend(["", f"_Last updated: {timestamp}_"])
-    return "\n".join(lines)
+    return "\n".join((
+        f"# Codex Pipeline Progress — {state.project_name}",
+        "",
+        _PR_TABLE_HEADER,
+        *rows,
+        "",
+        f"_Last updated: {timestamp}_",
+    ))
 
 
 def _ensure_repository(settings: GitHubSettings, root: Path) -> tuple[str, bool]:
@@ -220,12 +381,23 @@ def _ensure_repository(settings: GitHubSettings, root: Path) -> tuple[str, bool]
     return repository, True
 
 
+def _open_pull_requests(token: str, settings: GitHubSettings, root: Path) -> List[dict]:
+    repository, _ = _ensure_repository(settings, root)
+    owner, repo_name = repository.split("/", 1)
+    return _github_request(
+        token=token,
+        method="GET",
+        url=f"https://api.github.com/repos/{owner}/{repo_name}/pulls?head={owner}:{settings.branch}&state=open",
+    )  # type: ignore[return-value]
+
+
 def _ensure_pull_request(
     *,
     root: Path,
     settings: GitHubSettings,
     state: PipelineState,
     messages: List[str],
+    open_pulls: Optional[Future] = None,
 ) -> tuple[Optional[int], bool]:
     token = _github_token()
     if not token:
@@ -252,11 +424,10 @@ def _ensure_pull_request(
         messages.append(f"Updated pull request #{settings.pr_number} with the latest pipeline status.")
         return settings.pr_number, state_changed
 
-    existing: List[dict] = _github_request(
-        token=token,
-        method="GET",
-        url=f"{api_base}/pulls?head={owner}:{settings.branch}&state=open",
-    )  # type: ignore[assignment]
+    if open_pulls is not None:
+        existing = open_pulls.result()
+    else:
+        existing = _open_pull_requests(token, settings, root)
 
     if existing:
         number = int(existing[0]["number"])
@@ -306,21 +477,14 @@ def auto_sync_stage(
     if not settings or not settings.auto_sync:
         return result
 
-    try:
-        _ensure_git_repo(root)
-    except GitIntegrationError as exc:
-        result.messages.append(str(exc))
-        return result
-
     tracked_paths = [state_path]
     if artifact_path:
         artifact = root / artifact_path
         if artifact.exists():
             tracked_paths.append(artifact)
     try:
-        commit_sha = _commit_and_push(
+        commit_sha = _commit_stage(
             root=root,
-            settings=settings,
             stage_key=stage_key,
             stage_title=stage_title,
             tracked_paths=tracked_paths,
@@ -333,18 +497,31 @@ def auto_sync_stage(
         result.messages.append("GitHub sync skipped because there were no staged changes for this step.")
         return result
 
-    result.commit_sha = commit_sha
-    result.messages.append(
-        f"Pushed stage '{stage_title}' to {settings.remote}/{settings.branch} (commit {commit_sha[:7]})."
-    )
-
-    try:
-        pr_number, state_changed = _ensure_pull_request(
-            root=root, settings=settings, state=state, messages=result.messages
+    token = _github_token()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Looking up an open pull request is read-only, so it overlaps the push
+        # instead of waiting for it. Any lookup error surfaces from result().
+        open_pulls = None
+        if token and not settings.pr_number:
+            open_pulls = executor.submit(_open_pull_requests, token, settings, root)
+        try:
+            _run_git(["push", settings.remote, settings.branch], root=root)
+        except GitIntegrationError as exc:
+            result.messages.append(str(exc))
+            return result
+
+        result.commit_sha = commit_sha
+        result.messages.append(
+            f"Pushed stage '{stage_title}' to {settings.remote}/{settings.branch} (commit {commit_sha[:7]})."
         )
-    except GitIntegrationError as exc:
-        result.messages.append(str(exc))
-        return result
+
+        try:
+            pr_number, state_changed = _ensure_pull_request(
+                root=root, settings=settings, state=state, messages=result.messages, open_pulls=open_pulls
+            )
+        except GitIntegrationError as exc:
+            result.messages.append(str(exc))
+            return result
 
     if pr_number and pr_number != settings.pr_number:
         settings.pr_number = pr_number
@@ -363,12 +540,19 @@ def _latest_commit_sha(root: Path) -> str:
     return _run_git(["rev-parse", "HEAD"], root=root).stdout.strip()
 
 
+def _page_size(limit: int) -> int:
+    # GitHub accepts per_page values from 1 to 100.
+    return min(max(limit, 1), 100)
+
+
 def fetch_feedback(
     *,
     root: Path,
     settings: GitHubSettings,
     commit_sha: Optional[str] = None,
     max_reviews: int = 5,
+    max_check_runs: int = 30,
+    max_workflow_runs: int = 5,
 ) -> dict:
     """Retrieve review and check-run feedback for the tracked pull request."""
 
@@ -386,27 +570,30 @@ def fetch_feedback(
     api_base = f"https://api.github.com/repos/{owner}/{repo_name}"
 
     sha = commit_sha or _latest_commit_sha(root)
+    cache_path = _http_cache_path(root)
 
-    reviews: List[dict] = _github_request(
-        token=token,
-        method="GET",
-        url=f"{api_base}/pulls/{settings.pr_number}/reviews",
-    )  # type: ignore[assignment]
+    urls = [
+        f"{api_base}/pulls/{settings.pr_number}/reviews",
+        f"{api_base}/commits/{sha}/check-runs?per_page={_page_size(max_check_runs)}",
+        f"{api_base}/actions/runs?branch={settings.branch}&per_page={_page_size(max_workflow_runs)}",
+    ]
+    # The three lookups are independent, so overlap their round trips.
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        reviews_future, check_runs_future, workflows_future = [
+            executor.submit(_github_request, token=token, method="GET", url=url, cache_path=cache_path)
+            for url in urls
+        ]
+
+    reviews: List[dict] = reviews_future.result()  # type: ignore[assignment]
     recent_reviews = reviews[-max_reviews:] if reviews else []
 
-    check_runs_response = _github_request(
-        token=token,
-        method="GET",
-        url=f"{api_base}/commits/{sha}/check-runs",
-    )
+    check_runs_response = check_runs_future.result()
     check_runs = check_runs_response.get("check_runs", []) if isinstance(check_runs_response, dict) else []
+    check_runs = check_runs[:max_check_runs]
 
-    workflows_response = _github_request(
-        token=token,
-        method="GET",
-        url=f"{api_base}/actions/runs?branch={settings.branch}&per_page=5",
-    )
+    workflows_response = workflows_future.result()
     workflow_runs = workflows_response.get("workflow_runs", []) if isinstance(workflows_response, dict) else []
+    workflow_runs = workflow_runs[:max_workflow_runs]
 
     return {
         "commit": sha,
@@ -424,4 +611,5 @@ __all__ = [
     "auto_sync_stage",
     "fetch_feedback",
     "prepare_github_settings",
+    "remote_repository",
 ]
@@ -2,15 +2,26 @@
 from __future__ import annotations
 
 import argparse
+import io
+import os
 import sys
 from pathlib import Path
-from textwrap import indent
-from typing import Optional
+from typing import TYPE_CHECKING, BinaryIO, Optional
 
-from .github import AutoSyncResult, GitIntegrationError, auto_sync_stage, fetch_feedback, prepare_github_settings
 from .stages import ARTIFACT_STAGES, STAGE_ORDER, get_stage, model_label
 from .state import PipelineState, StateManager
 
+# The GitHub helpers pull in git/HTTP machinery, so commands import them on
+# demand to keep startup cheap for status, prompt, and --help.
+if TYPE_CHECKING:
+    from .github import AutoSyncResult
+
+# Resolved once; argparse already restricts stage arguments to these keys.
+_STAGE_BY_KEY = {stage_key: get_stage(stage_key) for stage_key in STAGE_ORDER}
+_INITIAL_STAGE_STATUS = {stage_key: "pending" for stage_key in STAGE_ORDER}
+
+_CAPTURE_CHUNK_SIZE = 1 << 20
+
 _STATUS_ICONS = {
     "pending": "⏳",
     "in_progress": "🔄",
@@ -18,37 +29,33 @@ _STATUS_ICONS = {
 }
 
 
-def _print_header(text: str) -> None:
-    print(f"\n=== {text} ===")
+def _append_header(out: list[str], text: str) -> None:
+    out.append(f"\n=== {text} ===\n")
 
 
 def _ready_marker(status: str) -> str:
     return "PASS" if status == "pass" else "TODO"
 
 
-def _print_stage_checklist(stage, state: PipelineState) -> None:
+def _append_stage_checklist(out: list[str], stage, state: PipelineState) -> None:
     if not stage.ready_checklist:
         return
     statuses = state.get_ready_status(stage.key)
-    print(indent("Ready checklist:", "    "))
+    out.append("    Ready checklist:\n")
     for index, item in enumerate(stage.ready_checklist, start=1):
         marker = _ready_marker(statuses.get(item, "todo"))
-        line = f"{index}. [{marker}] {item}"
-        print(indent(line, "        "))
+        out.append(f"        {index}. [{marker}] {item}\n")
 
 
 def _prompt_for_value(prompt: str, default: Optional[str] = None) -> str:
-    if default:
-        prompt = f"{prompt} [{default}]: "
-    else:
-        prompt = f"{prompt}: "
-    value = input(prompt).strip()
-    if not value:
+    display = f"{prompt} [{default}]: " if default else f"{prompt}: "
+    while True:
+        value = input(display).strip()
+        if value:
+            return value
         if default is not None:
             return default
         print("A value is required.")
-        return _prompt_for_value(prompt.rstrip(": "), default)
-    return value
 
 
 def command_init(args: argparse.Namespace, manager: StateManager) -> None:
@@ -62,6 +69,8 @@ def command_init(args: argparse.Namespace, manager: StateManager) -> None:
 
     github_settings = None
     if args.github_auto_sync or args.github_remote or args.github_branch or args.github_base:
+        from .github import GitIntegrationError, prepare_github_settings
+
         try:
             github_settings = prepare_github_settings(
                 manager.root,
@@ -74,7 +83,7 @@ def command_init(args: argparse.Namespace, manager: StateManager) -> None:
             print(f"Failed to configure GitHub integration: {exc}")
             sys.exit(1)
 
-    stage_status = {stage: "pending" for stage in STAGE_ORDER}
+    stage_status = _INITIAL_STAGE_STATUS.copy()
     state = PipelineState(
         project_name=project_name,
         concept=concept,
@@ -110,10 +119,9 @@ def _require_initialized(manager: StateManager) -> None:
 def _load_state(manager: StateManager) -> PipelineState:
     """Load pipeline state, exiting with a friendly message on failure."""
 
-    _require_initialized(manager)
     try:
         return manager.load()
-    except RuntimeError as exc:  # Defensive: load also calls ensure_initialized
+    except RuntimeError as exc:  # load raises when the pipeline is not initialized
         print(str(exc))
         sys.exit(1)
 
@@ -131,89 +139,98 @@ def _ensure_stage_order(state: PipelineState, stage_key: str) -> None:
 
 def command_status(manager: StateManager) -> None:
     state = _load_state(manager)
-    print(f"Project: {state.project_name}")
-    print(f"Model:   {model_label(state.model)}")
-    print(f"Concept: {state.concept}")
+    out = [
+        f"Project: {state.project_name}\n",
+        f"Model:   {model_label(state.model)}\n",
+        f"Concept: {state.concept}\n",
+    ]
 
     if state.github:
-        _print_header("GitHub Sync")
+        _append_header(out, "GitHub Sync")
         repo_label = state.github.repository or "(unknown repository)"
-        print(f"Remote: {state.github.remote} -> {repo_label}")
-        print(f"Branch: {state.github.branch} (base {state.github.base})")
-        print(f"Auto-sync: {'enabled' if state.github.auto_sync else 'disabled'}")
+        out.append(f"Remote: {state.github.remote} -> {repo_label}\n")
+        out.append(f"Branch: {state.github.branch} (base {state.github.base})\n")
+        out.append(f"Auto-sync: {'enabled' if state.github.auto_sync else 'disabled'}\n")
         if state.github.pr_number:
-            print(f"Pull request: #{state.github.pr_number}")
+            out.append(f"Pull request: #{state.github.pr_number}\n")
 
-    _print_header("Stage Progress")
-    for stage_key, status in state.list_statuses():
-        stage = get_stage(stage_key)
+    _append_header(out, "Stage Progress")
+    # list_statuses() yields stages in STAGE_ORDER, matching _STAGE_BY_KEY.
+    for (stage_key, status), stage in zip(state.list_statuses(), _STAGE_BY_KEY.values()):
         icon = _STATUS_ICONS.get(status, status)
-        print(f"{icon} {stage.title} ({stage_key}) -> {status}")
+        out.append(f"{icon} {stage.title} ({stage_key}) -> {status}\n")
         note = state.stage_notes.get(stage_key)
         if note:
-            print(indent(f"Note: {note}", "    "))
+            from textwrap import indent
+
+            out.append(indent(f"Note: {note}", "    ") + "\n")
         if stage.ready_checklist:
-            _print_stage_checklist(stage, state)
+            _append_stage_checklist(out, stage, state)
+
+    sys.stdout.write("".join(out))
 
 
 def command_prompt(args: argparse.Namespace, manager: StateManager) -> None:
     state = _load_state(manager)
-    stage = get_stage(args.stage)
-    label = model_label(state.model)
-
-    description = stage.description.format(
-        model_label=label, project_name=state.project_name, concept=state.concept
-    )
-    instructions = stage.instructions.format(
-        model_label=label, project_name=state.project_name, concept=state.concept
-    )
-
-    _print_header(stage.title)
-    print(description)
-
-    _print_header("Instructions")
-    print(instructions)
+    stage = _STAGE_BY_KEY[args.stage]
+    context = {
+        "model_label": model_label(state.model),
+        "project_name": state.project_name,
+        "concept": state.concept,
+    }
+    description = stage.format_description(context)
+    instructions = stage.format_instructions(context)
+
+    out: list[str] = []
+    _append_header(out, stage.title)
+    out.append(f"{description}\n")
+
+    _append_header(out, "Instructions")
+    out.append(f"{instructions}\n")
 
     if stage.ready_checklist:
-        _print_header("Ready Checklist")
-        for item in stage.ready_checklist:
-            print(f"- {item}")
+        _append_header(out, "Ready Checklist")
+        out.extend(f"- {item}\n" for item in stage.ready_checklist)
 
-    system_prompt = stage.format_system_prompt(
-        project_name=state.project_name, model_label=label, concept=state.concept
-    )
+    system_prompt = stage.format_system_prompt(context)
     if system_prompt:
-        _print_header("System Prompt")
-        print(system_prompt)
+        _append_header(out, "System Prompt")
+        out.append(f"{system_prompt}\n")
 
-    kickoff_prompt = stage.format_kickoff_prompt(
-        project_name=state.project_name, model_label=label, concept=state.concept
-    )
+    kickoff_prompt = stage.format_kickoff_prompt(context)
     if kickoff_prompt:
-        _print_header("Kickoff Prompt")
-        print(kickoff_prompt)
+        _append_header(out, "Kickoff Prompt")
+        out.append(f"{kickoff_prompt}\n")
 
+    sys.stdout.write("".join(out))
 
-def _read_capture_content(file_path: Optional[Path]) -> str:
-    if file_path:
-        return file_path.read_text()
+
+def _read_capture_content() -> str:
+    """Return the artifact text pasted on stdin, always ending with a newline."""
 
     print("Paste the artifact content. End input with a line containing only 'EOF'.")
-    lines = []
-    while True:
-        try:
-            line = input()
-        except EOFError:
-            break
+    buffer = io.StringIO()
+    for line in sys.stdin:
         if line.strip() == "EOF":
             break
-        lines.append(line)
-    content = "\n".join(lines).rstrip()
+        buffer.write(line)
+    content = buffer.getvalue().rstrip()
     if not content:
         raise RuntimeError("No content captured. Aborting.")
     return content + "\n"
 
 
+def _copy_capture_content(source: BinaryIO, dest: BinaryIO) -> None:
+    """Stream source into dest in large chunks, ending dest with a newline."""
+
+    last = b""
+    for chunk in iter(lambda: source.read(_CAPTURE_CHUNK_SIZE), b""):
+        dest.write(chunk)
+        last = chunk[-1:]
+    if last != b"\n":
+        dest.write(b"\n")
+
+
 def _handle_auto_sync_result(
     *,
     stage,
@@ -242,7 +259,7 @@ def _handle_auto_sync_result(
 
 def command_capture(args: argparse.Namespace, manager: StateManager) -> None:
     state = _load_state(manager)
-    stage = get_stage(args.stage)
+    stage = _STAGE_BY_KEY[args.stage]
     if not stage.artifact_path:
         print(f"Stage '{stage.key}' does not produce an artifact. Use the 'complete' command instead.")
         sys.exit(1)
@@ -252,37 +269,45 @@ def command_capture(args: argparse.Namespace, manager: StateManager) -> None:
     artifact_path = manager.root / stage.artifact_path
     artifact_path.parent.mkdir(parents=True, exist_ok=True)
 
-    repo_root = manager.root.parent
-    try:
-        display_path = artifact_path.relative_to(repo_root)
-    except ValueError:
-        display_path = artifact_path.relative_to(manager.root)
-
-    content = _read_capture_content(args.file)
-    mode = "a" if args.append else "w"
-    with artifact_path.open(mode, encoding="utf-8") as f:
-        f.write(content)
-        if args.append and not content.endswith("\n"):
-            f.write("\n")
-
-    ready_complete = state.is_ready_complete(stage.key)
-    if ready_complete:
-        state.mark_complete(stage.key)
-        state.stage_notes[stage.key] = f"Artifact saved to {display_path}"
-        manager.save(state)
-        print(f"Saved artifact to {display_path} and marked stage complete.")
+    display_path = Path(os.path.relpath(artifact_path, manager.root.parent))
+
+    # Open the source before the artifact so a bad --file or empty paste
+    # never truncates an existing artifact.
+    if args.file:
+        source: BinaryIO = args.file.open("rb")
+        if artifact_path.exists() and os.path.samestat(os.fstat(source.fileno()), artifact_path.stat()):
+            # Re-capturing the artifact onto itself: buffer it before it is truncated or grows.
+            with source:
+                source = io.BytesIO(source.read())
     else:
-        state.set_status(stage.key, "in_progress")
-        state.stage_notes[stage.key] = (
-            f"Artifact saved to {display_path}; ready checklist items remain TODO"
-        )
-        manager.save(state)
-        print(f"Saved artifact to {display_path}. Stage remains in progress until checklist passes.")
-        print(
-            "Use 'python -m codex.pipeline_cli checklist {stage} show' to review outstanding items.".format(
-                stage=stage.key
+        source = io.BytesIO(_read_capture_content().encode("utf-8"))
+    mode = "ab" if args.append else "wb"
+    # The state must be on disk before auto-sync stages it, so the
+    # transaction closes ahead of the sync.
+    with manager.transaction():
+        with source, artifact_path.open(mode) as f:
+            _copy_capture_content(source, f)
+
+        ready_complete = state.is_ready_complete(stage.key)
+        if ready_complete:
+            state.mark_complete(stage.key)
+            state.stage_notes[stage.key] = f"Artifact saved to {display_path}"
+            manager.save(state)
+            print(f"Saved artifact to {display_path} and marked stage complete.")
+        else:
+            state.set_status(stage.key, "in_progress")
+            state.stage_notes[stage.key] = (
+                f"Artifact saved to {display_path}; ready checklist items remain TODO"
             )
-        )
+            manager.save(state)
+            print(f"Saved artifact to {display_path}. Stage remains in progress until checklist passes.")
+            print(
+                "Use 'python -m codex.pipeline_cli checklist {stage} show' to review outstanding items.".format(
+                    stage=stage.key
+                )
+            )
+
+    from .github import auto_sync_stage
 
     result = auto_sync_stage(
         root=manager.root,
@@ -298,27 +323,30 @@ def command_capture(args: argparse.Namespace, manager: StateManager) -> None:
 
 def command_complete(args: argparse.Namespace, manager: StateManager) -> None:
     state = _load_state(manager)
-    stage = get_stage(args.stage)
+    stage = _STAGE_BY_KEY[args.stage]
     if stage.artifact_path and not (manager.root / stage.artifact_path).exists():
         print(
             "Cannot complete this stage because its artifact is missing. Use the capture command first."
         )
         sys.exit(1)
-    try:
-        state.mark_complete(stage.key)
-    except RuntimeError as exc:
-        print(str(exc))
-        print(
-            "Use 'python -m codex.pipeline_cli checklist {stage} show' to update the ready checklist.".format(
-                stage=stage.key
+    with manager.transaction():
+        try:
+            state.mark_complete(stage.key)
+        except RuntimeError as exc:
+            print(str(exc))
+            print(
+                "Use 'python -m codex.pipeline_cli checklist {stage} show' to update the ready checklist.".format(
+                    stage=stage.key
+                )
             )
-        )
-        sys.exit(1)
-    if args.note:
-        state.stage_notes[stage.key] = args.note
-    manager.save(state)
+            sys.exit(1)
+        if args.note:
+            state.stage_notes[stage.key] = args.note
+        manager.save(state)
     print(f"Stage '{stage.title}' marked as complete.")
 
+    from .github import auto_sync_stage
+
     result = auto_sync_stage(
         root=manager.root,
         state=state,
@@ -353,13 +381,15 @@ def _resolve_checklist_item(stage, *, index: Optional[int], name: Optional[str])
 
 def command_checklist(args: argparse.Namespace, manager: StateManager) -> None:
     state = _load_state(manager)
-    stage = get_stage(args.stage)
+    stage = _STAGE_BY_KEY[args.stage]
     if not stage.ready_checklist:
         print(f"Stage '{stage.title}' does not have a ready checklist to manage.")
         return
 
     if args.checklist_command == "show":
-        _print_stage_checklist(stage, state)
+        out: list[str] = []
+        _append_stage_checklist(out, stage, state)
+        sys.stdout.write("".join(out))
         return
 
     if args.checklist_command == "reset":
@@ -414,25 +444,40 @@ def command_github_configure(args: argparse.Namespace, manager: StateManager) ->
     else:
         desired_auto = args.auto_sync
 
-    try:
-        new_settings = prepare_github_settings(
-            manager.root,
-            remote=desired_remote,
-            branch=desired_branch,
-            base=desired_base,
-            auto_sync=desired_auto,
-        )
-    except GitIntegrationError as exc:
-        print(f"GitHub configuration failed: {exc}")
-        sys.exit(1)
+    from .github import GitIntegrationError, prepare_github_settings, remote_repository
 
-    if current and current.pr_number and not new_settings.pr_number:
-        new_settings.pr_number = current.pr_number
-    if current and current.repository and not new_settings.repository:
-        new_settings.repository = current.repository
+    # With identical options, one `git remote get-url` confirms the remote still
+    # exists and points at the stored repository; anything else re-resolves.
+    unchanged = (
+        current is not None
+        and current.repository
+        and (current.remote, current.branch, current.base, current.auto_sync)
+        == (desired_remote, desired_branch, desired_base, desired_auto)
+        and remote_repository(manager.root, current.remote) == current.repository
+    )
+    if unchanged:
+        # Nothing changed; skip the full git probe and the state write.
+        new_settings = current
+    else:
+        try:
+            new_settings = prepare_github_settings(
+                manager.root,
+                remote=desired_remote,
+                branch=desired_branch,
+                base=desired_base,
+                auto_sync=desired_auto,
+            )
+        except GitIntegrationError as exc:
+            print(f"GitHub configuration failed: {exc}")
+            sys.exit(1)
 
-    state.github = new_settings
-    manager.save(state)
+        if current and current.pr_number and not new_settings.pr_number:
+            new_settings.pr_number = current.pr_number
+        if current and current.repository and not new_settings.repository:
+            new_settings.repository = current.repository
+
+        state.github = new_settings
+        manager.save(state)
 
     status = "enabled" if new_settings.auto_sync else "disabled"
     print(
@@ -454,12 +499,16 @@ def command_github_feedback(args: argparse.Namespace, manager: StateManager) ->
         )
         sys.exit(1)
 
+    from .github import GitIntegrationError, fetch_feedback
+
     try:
         data = fetch_feedback(
             root=manager.root,
             settings=state.github,
             commit_sha=args.commit,
             max_reviews=args.max_reviews,
+            max_check_runs=args.max_checks,
+            max_workflow_runs=args.max_runs,
         )
     except GitIntegrationError as exc:
         print(f"Unable to fetch GitHub feedback: {exc}")
@@ -468,13 +517,14 @@ def command_github_feedback(args: argparse.Namespace, manager: StateManager) ->
     if data.get("repository_updated"):
         manager.save(state)
 
-    _print_header("Commit")
-    print(f"Inspecting commit: {data['commit']}")
+    out: list[str] = []
+    _append_header(out, "Commit")
+    out.append(f"Inspecting commit: {data['commit']}\n")
 
-    _print_header("Check Runs")
+    _append_header(out, "Check Runs")
     check_runs = data.get("check_runs", [])
     if not check_runs:
-        print("No check runs reported yet.")
+        out.append("No check runs reported yet.\n")
     else:
         for check in check_runs:
             name = check.get("name", "<unknown>")
@@ -484,14 +534,14 @@ def command_github_feedback(args: argparse.Namespace, manager: StateManager) ->
             line = f"- {name}: {conclusion}"
             if completed:
                 line += f" (updated {completed})"
-            print(line)
+            out.append(f"{line}\n")
             if details_url:
-                print(indent(details_url, "  "))
+                out.append(f"  {details_url}\n")
 
-    _print_header("Workflow Runs")
+    _append_header(out, "Workflow Runs")
     runs = data.get("workflow_runs", [])
     if not runs:
-        print("No workflow runs found for the tracked branch.")
+        out.append("No workflow runs found for the tracked branch.\n")
     else:
         for run in runs:
             name = run.get("name") or "Workflow"
@@ -502,30 +552,34 @@ def command_github_feedback(args: argparse.Namespace, manager: StateManager) ->
             summary = f"- {name} #{number}: {status}"
             if conclusion:
                 summary += f" → {conclusion}"
-            print(summary)
+            out.append(f"{summary}\n")
             if html_url:
-                print(indent(html_url, "  "))
+                out.append(f"  {html_url}\n")
 
-    _print_header("Recent Reviews")
+    _append_header(out, "Recent Reviews")
     reviews = data.get("reviews", [])
     if not reviews:
-        print("No pull request reviews have been submitted yet.")
+        out.append("No pull request reviews have been submitted yet.\n")
     else:
         for review in reviews:
             user = review.get("user", {}).get("login", "unknown")
             state_label = review.get("state")
             submitted = review.get("submitted_at") or review.get("dismissed_at") or ""
-            print(f"- {user}: {state_label} at {submitted}")
+            out.append(f"- {user}: {state_label} at {submitted}\n")
             body = review.get("body")
             if body:
-                print(indent(body.strip(), "  "))
+                body = body.strip()
+                if "\n" in body:
+                    from textwrap import indent
 
+                    out.append(indent(body, "  ") + "\n")
+                else:
+                    out.append(f"  {body}\n" if body else "\n")
+
+    sys.stdout.write("".join(out))
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Codex pipeline orchestration CLI")
-    subparsers = parser.add_subparsers(dest="command")
 
-    # init
+def _add_init_parser(subparsers) -> None:
     init_parser = subparsers.add_parser("init", help="Initialize the pipeline state")
     init_parser.add_argument("--project", help="Project name")
     init_parser.add_argument("--concept", help="Initial concept or problem statement")
@@ -548,25 +602,30 @@ def build_parser() -> argparse.ArgumentParser:
     )
     init_parser.add_argument("--force", action="store_true", help="Overwrite existing state")
 
-    # status
+
+def _add_status_parser(subparsers) -> None:
     subparsers.add_parser("status", help="Show current pipeline status")
 
-    # prompt
+
+def _add_prompt_parser(subparsers) -> None:
     prompt_parser = subparsers.add_parser("prompt", help="Display prompts for a stage")
     prompt_parser.add_argument("stage", choices=STAGE_ORDER, help="Stage key to display")
 
-    # capture
+
+def _add_capture_parser(subparsers) -> None:
     capture_parser = subparsers.add_parser("capture", help="Store an artifact for a stage")
-    capture_parser.add_argument("stage", choices=[s for s in STAGE_ORDER if s in ARTIFACT_STAGES])
+    capture_parser.add_argument("stage", choices=ARTIFACT_STAGES)
     capture_parser.add_argument("--file", type=Path, help="Read content from a file instead of stdin")
     capture_parser.add_argument("--append", action="store_true", help="Append instead of overwrite")
 
-    # complete
+
+def _add_complete_parser(subparsers) -> None:
     complete_parser = subparsers.add_parser("complete", help="Mark a stage as complete")
     complete_parser.add_argument("stage", choices=STAGE_ORDER)
     complete_parser.add_argument("--note", help="Optional note to attach to the stage")
 
-    # checklist
+
+def _add_checklist_parser(subparsers) -> None:
     checklist_parser = subparsers.add_parser(
         "checklist", help="Inspect or update a stage's ready checklist"
     )
@@ -591,10 +650,12 @@ def build_parser() -> argparse.ArgumentParser:
 
     checklist_sub.add_parser("reset", help="Reset all ready checklist items to TODO")
 
-    # reset
+
+def _add_reset_parser(subparsers) -> None:
     subparsers.add_parser("reset", help="Delete existing pipeline state")
 
-    # GitHub helpers
+
+def _add_github_parser(subparsers) -> None:
     github_parser = subparsers.add_parser("github", help="GitHub integration utilities")
     github_sub = github_parser.add_subparsers(dest="github_command")
     github_sub.required = True
@@ -630,13 +691,69 @@ def build_parser() -> argparse.ArgumentParser:
         default=5,
         help="Maximum number of recent reviews to display",
     )
+    github_feedback.add_argument(
+        "--max-checks",
+        type=int,
+        default=30,
+        help="Maximum number of check runs to fetch and display",
+    )
+    github_feedback.add_argument(
+        "--max-runs",
+        type=int,
+        default=5,
+        help="Maximum number of workflow runs to fetch and display",
+    )
+
+
+# Subcommand builders in the order they appear in --help.
+_SUBCOMMAND_BUILDERS = {
+    "init": _add_init_parser,
+    "status": _add_status_parser,
+    "prompt": _add_prompt_parser,
+    "capture": _add_capture_parser,
+    "complete": _add_complete_parser,
+    "checklist": _add_checklist_parser,
+    "reset": _add_reset_parser,
+    "github": _add_github_parser,
+}
 
+
+class _ParseFailed(Exception):
+    """Raised by the single-subcommand parser instead of printing a usage error."""
+
+
+class _SingleCommandParser(argparse.ArgumentParser):
+    def error(self, message: str):
+        raise _ParseFailed(message)
+
+
+def build_parser(
+    commands: Optional[list[str]] = None,
+    parser_class: type[argparse.ArgumentParser] = argparse.ArgumentParser,
+) -> argparse.ArgumentParser:
+    parser = parser_class(description="Codex pipeline orchestration CLI")
+    subparsers = parser.add_subparsers(dest="command")
+    for name, add_parser in _SUBCOMMAND_BUILDERS.items():
+        if commands is None or name in commands:
+            add_parser(subparsers)
     return parser
 
 
-def main(argv: Optional[list[str]] = None) -> None:
+def _parse_args(argv: list[str]) -> tuple[argparse.ArgumentParser, argparse.Namespace]:
+    """Parse argv, building only the chosen subcommand's parser when possible."""
+
+    if argv and argv[0] in _SUBCOMMAND_BUILDERS:
+        parser = build_parser([argv[0]], _SingleCommandParser)
+        try:
+            return parser, parser.parse_args(argv)
+        except _ParseFailed:
+            pass  # Re-parse with the full tree so usage errors list every command.
     parser = build_parser()
-    args = parser.parse_args(argv)
+    return parser, parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser, args = _parse_args(sys.argv[1:] if argv is None else argv)
 
     if not args.command:
         parser.print_help()
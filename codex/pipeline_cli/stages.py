@@ -1,12 +1,19 @@
 """Definitions for the Codex pipeline stages and prompts."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from string import Formatter
+import sys
 from textwrap import dedent
-from typing import Dict, Iterable, List, Optional
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
+# (literal text, field name, format spec) triples from Formatter.parse.
+_TemplateParts = Tuple[Tuple[str, Optional[str], str], ...]
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Stage:
     """Represents a single stage in the workflow pipeline."""
 
@@ -16,28 +23,106 @@ class Stage:
     instructions: str
     system_prompt_template: Optional[str] = None
     kickoff_prompt_template: Optional[str] = None
-    ready_checklist: Optional[List[str]] = None
+    ready_checklist: Optional[Tuple[str, ...]] = None
     artifact_path: Optional[str] = None
+    _parts: Dict[str, _TemplateParts] = field(
+        init=False, repr=False, compare=False, default_factory=dict
+    )
 
-    def format_system_prompt(self, *, project_name: str, model_label: str, concept: str) -> Optional[str]:
+    def __post_init__(self) -> None:
+        # Checklist items are keys in the persisted ready_status; interning
+        # them here lets PipelineState.from_dict map loaded keys onto these
+        # exact objects.
+        if self.ready_checklist:
+            object.__setattr__(self, "ready_checklist", tuple(map(sys.intern, self.ready_checklist)))
+
+    def _template_parts(self, name: str) -> _TemplateParts:
+        # Templates are parsed on first render, so importing the module (or
+        # running a command that never prints prompts) skips the work.
+        parts = self._parts.get(name)
+        if parts is None:
+            if name == "description":
+                parts = _parse_template(self.description)
+            elif name == "instructions":
+                parts = _parse_template(self.instructions)
+            else:
+                template = getattr(self, f"{name}_template")
+                parts = _strip_literal_edges(
+                    _parse_template(
+                        dedent(template), {"checklist_block": _format_checklist(self.ready_checklist)}
+                    )
+                )
+            self._parts[name] = parts
+        return parts
+
+    def format_description(self, context: Mapping[str, str]) -> str:
+        return _render_template(self._template_parts("description"), context)
+
+    def format_instructions(self, context: Mapping[str, str]) -> str:
+        return _render_template(self._template_parts("instructions"), context)
+
+    def format_system_prompt(self, context: Mapping[str, str]) -> Optional[str]:
         if not self.system_prompt_template:
             return None
-        return dedent(self.system_prompt_template).format(
-            project_name=project_name,
-            model_label=model_label,
-            concept=concept,
-            checklist_block=_format_checklist(self.ready_checklist),
-        ).strip()
-
-    def format_kickoff_prompt(self, *, project_name: str, model_label: str, concept: str) -> Optional[str]:
+        # strip() only copies when an edge field rendered surrounding whitespace.
+        return _render_template(self._template_parts("system_prompt"), context).strip()
+
+    def format_system_prompt_cacheable(self, context: Mapping[str, str]) -> Optional[Tuple[str, str]]:
+        """Return (static prefix, rendered remainder); together they equal format_system_prompt()."""
+
+        if not self.system_prompt_template:
+            return None
+        parts = self._template_parts("system_prompt")
+        literal, field_name, format_spec = parts[0]
+        if field_name is None:
+            # No placeholders at all: the whole prompt is static.
+            return literal.strip(), ""
+        prefix = literal.lstrip()
+        suffix = _render_template((("", field_name, format_spec),) + parts[1:], context).rstrip()
+        return (prefix, suffix) if prefix else ("", suffix.lstrip())
+
+    def format_kickoff_prompt(self, context: Mapping[str, str]) -> Optional[str]:
         if not self.kickoff_prompt_template:
             return None
-        return dedent(self.kickoff_prompt_template).format(
-            project_name=project_name,
-            model_label=model_label,
-            concept=concept,
-            checklist_block=_format_checklist(self.ready_checklist),
-        ).strip()
+        return _render_template(self._template_parts("kickoff_prompt"), context).strip()
+
+
+def _parse_template(template: str, constants: Optional[Mapping[str, str]] = None) -> _TemplateParts:
+    """Split a str.format template into pieces, substituting constants up front."""
+
+    parts: List[Tuple[str, Optional[str], str]] = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(template):
+        if conversion or (field_name is not None and not field_name.isidentifier()):
+            raise ValueError(f"Unsupported template field {{{field_name}}}")  # pragma: no cover
+        if constants and field_name in constants:
+            literal += format(constants[field_name], format_spec or "")
+            field_name = None
+        if parts and parts[-1][1] is None:
+            literal = parts.pop()[0] + literal
+        parts.append((literal, field_name, format_spec or ""))
+    return tuple(parts)
+
+
+def _strip_literal_edges(parts: _TemplateParts) -> _TemplateParts:
+    """Pre-strip template edges that are literal text, so rendering yields stripped output."""
+
+    literal, field_name, format_spec = parts[0]
+    if literal.strip():
+        parts = ((literal.lstrip(), field_name, format_spec),) + parts[1:]
+    literal, field_name, format_spec = parts[-1]
+    if field_name is None and literal.strip():
+        parts = parts[:-1] + ((literal.rstrip(), None, format_spec),)
+    return parts
+
+
+def _render_template(parts: _TemplateParts, context: Mapping[str, str]) -> str:
+    # Plain {name} fields, the only kind the stage templates use, skip the
+    # format-spec machinery entirely.
+    return "".join([
+        literal if field_name is None
+        else literal + (format(context[field_name], format_spec) if format_spec else str(context[field_name]))
+        for literal, field_name, format_spec in parts
+    ])
 
 
 _MODEL_LABELS = {
@@ -46,27 +131,29 @@ _MODEL_LABELS = {
 }
 
 
+@lru_cache(maxsize=32)
 def model_label(model: str) -> str:
-    try:
-        return _MODEL_LABELS[model]
-    except KeyError as exc:  # pragma: no cover - defensive programming
-        raise ValueError(f"Unsupported model: {model}") from exc
+    label = _MODEL_LABELS.get(model)
+    if label is None:  # pragma: no cover - defensive programming
+        raise ValueError(f"Unsupported model: {model}")
+    return label
 
 
 def _format_checklist(checklist: Optional[Iterable[str]]) -> str:
     if not checklist:
         return ""
-    bullet_lines = [f"- {item}" for item in checklist]
-    return "\n".join(bullet_lines)
+    return "\n".join(["- " + item for item in checklist])
 
 
-STAGES: Dict[str, Stage] = {}
+_REGISTRY: Dict[str, Stage] = {}
+# Read-only view of the registry; register_stage() is the only writer.
+STAGES: Mapping[str, Stage] = MappingProxyType(_REGISTRY)
 
 
 def register_stage(stage: Stage) -> None:
     if stage.key in STAGES:  # pragma: no cover - guard against programmer error
         raise KeyError(f"Stage '{stage.key}' already registered")
-    STAGES[stage.key] = stage
+    _REGISTRY[stage.key] = stage
 
 
 # --- Stage definitions ----------------------------------------------------
@@ -92,8 +179,7 @@ register_stage(
             """
         ).strip(),
         system_prompt_template="""
-            You are {model_label}, an expert product requirements analyst.
-            Project name: {project_name}.
+            You are an expert product requirements analyst.
 
             Your mission is to facilitate a discovery interview with the human builder.
             Ask one focused question per turn, then update a running summary with the
@@ -108,6 +194,10 @@ register_stage(
 
             Ready checklist:
             {checklist_block}
+
+            Session context:
+              - You are running as {model_label}.
+              - Project name: {project_name}
         """,
         kickoff_prompt_template="""
             Project concept: {concept}
@@ -116,7 +206,7 @@ register_stage(
             maintain the running summary, and continue until I respond with
             "READY CHECK PASSED".
         """,
-        ready_checklist=[
+        ready_checklist=(
             "Primary user personas identified",
             "Business or mission outcomes captured",
             "Key functional capabilities outlined",
@@ -124,7 +214,7 @@ register_stage(
             "Constraints and dependencies recorded",
             "Success metrics or acceptance tests drafted",
             "Out-of-scope boundaries acknowledged",
-        ],
+        ),
     )
 )
 
@@ -143,8 +233,7 @@ register_stage(
             """
         ).strip(),
         system_prompt_template="""
-            You are {model_label}, acting as a senior requirements engineer for the project
-            "{project_name}".
+            You are acting as a senior requirements engineer for the project named below.
 
             Produce a Markdown document named `requirements.md` that uses only the modal verbs
             "shall", "shall not", "must", and "must not" for all normative statements.
@@ -158,6 +247,10 @@ register_stage(
 
             Each section should contain numbered lists. Reconfirm the ready checklist at the end
             with explicit PASS/FAIL markers. Do not include implementation details.
+
+            Session context:
+              - You are running as {model_label}.
+              - Project name: {project_name}
         """,
         kickoff_prompt_template="""
             Using the final discovery notes below, draft `requirements.md` according to the
@@ -167,13 +260,13 @@ register_stage(
             Discovery summary:
             <paste the Confirmed Facts / Assumptions / Open Questions summary here>
         """,
-        ready_checklist=[
+        ready_checklist=(
             "All required sections are present and numbered",
             "Normative statements only use shall/shall not/must/must not",
             "Acceptance criteria map to success metrics",
             "Out-of-scope items listed explicitly",
             "Ready checklist restated with PASS for every item",
-        ],
+        ),
         artifact_path="artifacts/requirements.md",
     )
 )
@@ -193,7 +286,7 @@ register_stage(
             """
         ).strip(),
         system_prompt_template="""
-            You are {model_label}, working as the lead software architect for "{project_name}".
+            You are working as the lead software architect for the project named below.
             Produce an `architecture.md` document that:
               - Summarizes the solution context and core components.
               - Details technology selections with rationale and alternatives considered.
@@ -202,6 +295,10 @@ register_stage(
 
             Present decisions using Markdown with subsections per area and optional text-based diagrams
             (Mermaid or C4 notations). Do not provide any source code.
+
+            Session context:
+              - You are running as {model_label}.
+              - Project name: {project_name}
         """,
         kickoff_prompt_template="""
             Reference the approved `requirements.md` content below to produce `architecture.md`
@@ -211,13 +308,13 @@ register_stage(
             Requirements:
             <paste contents of codex/artifacts/requirements.md here>
         """,
-        ready_checklist=[
+        ready_checklist=(
             "Solution context and scope described",
             "Component and integration overview documented",
             "Technology choices include rationale and alternatives",
             "Cross-cutting concerns addressed",
             "Traceability table links decisions to requirements",
-        ],
+        ),
         artifact_path="artifacts/architecture.md",
     )
 )
@@ -237,7 +334,7 @@ register_stage(
             """
         ).strip(),
         system_prompt_template="""
-            You are {model_label}, the lead implementation strategist for "{project_name}".
+            You are the lead implementation strategist for the project named below.
             Produce an `implementation.md` playbook that stands alone for developers. Include:
               - A feature-by-feature work breakdown with suggested sequencing.
               - Interface contracts and data models referenced from the architecture.
@@ -247,6 +344,10 @@ register_stage(
               - A migration or rollout plan if relevant.
 
             Ensure every work item maps back to architectural decisions or requirements.
+
+            Session context:
+              - You are running as {model_label}.
+              - Project name: {project_name}
         """,
         kickoff_prompt_template="""
             Using the finalized `requirements.md` and `architecture.md` documents provided below,
@@ -259,13 +360,13 @@ register_stage(
             Architecture:
             <paste contents of codex/artifacts/architecture.md here>
         """,
-        ready_checklist=[
+        ready_checklist=(
             "Work breakdown covers all major features",
             "Interfaces and data models trace back to architecture",
             "Testing strategy spans multiple levels",
             "Environment and tooling instructions included",
             "Pre-coding readiness checklist provided",
-        ],
+        ),
         artifact_path="artifacts/implementation.md",
     )
 )
@@ -286,21 +387,24 @@ register_stage(
             """
         ).strip(),
         system_prompt_template="""
-            You are {model_label} acting as a senior pair-programmer and TDD coach.
+            You are acting as a senior pair-programmer and TDD coach.
             Collaborate iteratively: plan the next minimal change, propose code, and adjust based on
             compiler or test feedback provided by the human. Never skip writing or updating tests.
             Confirm when the current slice is green before suggesting another.
+
+            Session context:
+              - You are running as {model_label}.
         """,
         kickoff_prompt_template="""
             We are starting implementation guided by `implementation.md`. Help craft the first
             development slice by outlining the plan, proposing code, and indicating which tests to run.
         """,
-        ready_checklist=[
+        ready_checklist=(
             "Every change accompanied by tests or validation",
             "Local automated checks pass",
             "Implementation.md updated if scope shifts",
             "Summary of work captured in codex/artifacts/code_log.md",
-        ],
+        ),
         artifact_path="artifacts/code_log.md",
     )
 )
@@ -320,7 +424,7 @@ register_stage(
             """
         ).strip(),
         system_prompt_template="""
-            You are {model_label}, an uncompromising software reviewer.
+            You are an uncompromising software reviewer.
             Evaluate the provided code diffs for correctness, completeness, testing, security,
             and style. Respond with a structured review containing:
               - Verdict: PASS or BLOCK
@@ -328,6 +432,9 @@ register_stage(
               - Suggestions (optional improvements)
               - Tests & Evidence summary
             Refuse to issue PASS until every blocking issue is resolved.
+
+            Session context:
+              - You are running as {model_label}.
         """,
         kickoff_prompt_template="""
             Review the following diff and context. Apply the review rubric and return a PASS or
@@ -342,12 +449,12 @@ register_stage(
             Test Results:
             <paste latest test output>
         """,
-        ready_checklist=[
+        ready_checklist=(
             "Reviewer provides explicit PASS verdict",
             "All blocking comments resolved",
             "Test evidence attached to review",
             "Review summary saved in codex/artifacts/review_log.md",
-        ],
+        ),
         artifact_path="artifacts/review_log.md",
     )
 )
@@ -366,7 +473,7 @@ register_stage(
             """
         ).strip(),
         system_prompt_template="""
-            You are {model_label} serving as the release manager for "{project_name}".
+            You are serving as the release manager for the project named below.
             Assess whether the increment is ready to ship by verifying:
               - Requirements satisfied with evidence links
               - Architecture and implementation documents updated if scope changed
@@ -374,23 +481,27 @@ register_stage(
               - Outstanding risks, mitigations, and follow-up actions
 
             Produce a Markdown readiness report summarizing the evidence and a final READY / NOT READY decision.
+
+            Session context:
+              - You are running as {model_label}.
+              - Project name: {project_name}
         """,
         kickoff_prompt_template="""
             Using the supplied artifacts and test evidence, create the release readiness report.
             Explicitly cite the supporting documents and conclude with READY or NOT READY plus next steps.
         """,
-        ready_checklist=[
+        ready_checklist=(
             "Requirements traced to implemented work",
             "Test evidence documented",
             "Risks and mitigations listed",
             "Final READY/NOT READY decision recorded",
-        ],
+        ),
         artifact_path="artifacts/ready_report.md",
     )
 )
 
 
-STAGE_ORDER = [
+STAGE_ORDER: Tuple[str, ...] = (
     "requirements_loop",
     "requirements_doc",
     "architecture_doc",
@@ -398,24 +509,43 @@ STAGE_ORDER = [
     "code_build",
     "review_loop",
     "ready_gate",
-]
+)
+
+STAGE_INDEX: Dict[str, int] = {stage_key: index for index, stage_key in enumerate(STAGE_ORDER)}
 
 
-ARTIFACT_STAGES = [stage.key for stage in STAGES.values() if stage.artifact_path]
+ARTIFACT_STAGES: Tuple[str, ...] = tuple(
+    stage_key for stage_key in STAGE_ORDER if STAGES[stage_key].artifact_path
+)
 
 
 def get_stage(stage_key: str) -> Stage:
-    try:
-        return STAGES[stage_key]
-    except KeyError as exc:  # pragma: no cover - defensive
-        raise KeyError(f"Unknown stage: {stage_key}") from exc
+    stage = STAGES.get(stage_key)
+    if stage is None:  # pragma: no cover - defensive
+        raise KeyError(f"Unknown stage: {stage_key}")
+    return stage
+
+
+def render_all(project_name: str, model: str, concept: str) -> Dict[str, Dict[str, Optional[str]]]:
+    """Render the system and kickoff prompts of every stage with one shared context."""
+
+    context = {"project_name": project_name, "model_label": model_label(model), "concept": concept}
+    return {
+        stage_key: {
+            "system": STAGES[stage_key].format_system_prompt(context),
+            "kickoff": STAGES[stage_key].format_kickoff_prompt(context),
+        }
+        for stage_key in STAGE_ORDER
+    }
 
 
 __all__ = [
     "Stage",
     "STAGES",
     "STAGE_ORDER",
+    "STAGE_INDEX",
     "ARTIFACT_STAGES",
     "get_stage",
     "model_label",
+    "render_all",
 ]
@@ -1,19 +1,29 @@
 """State management utilities for the Codex pipeline CLI."""
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-import json
+from functools import lru_cache
+import hashlib
+import os
+import re
+import sys
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterator, Optional, Tuple
 
-from .stages import STAGE_ORDER, get_stage
+from .stages import STAGE_INDEX, STAGE_ORDER, Stage, get_stage
 
 
-VALID_STATUSES = {"pending", "in_progress", "complete"}
-VALID_READY_STATES = {"todo", "pass"}
+VALID_STATUSES = frozenset({"pending", "in_progress", "complete"})
+VALID_READY_STATES = frozenset({"todo", "pass"})
+# Stages that must be complete before each stage may advance.
+_PRIOR_STAGES = {stage: STAGE_ORDER[:index] for stage, index in STAGE_INDEX.items()}
+# Resolved once at import instead of on every StateManager() construction.
+_DEFAULT_ROOT = Path(__file__).resolve().parents[1]
+_NOT_INITIALIZED = "Pipeline not initialized. Run 'python -m codex.pipeline_cli init' first."
 
 
-@dataclass
+@dataclass(slots=True)
 class GitHubSettings:
     """Configuration for syncing pipeline progress to GitHub."""
 
@@ -46,7 +56,7 @@ class GitHubSettings:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class PipelineState:
     """Represents persisted pipeline metadata for a project."""
 
@@ -57,12 +67,18 @@ class PipelineState:
     stage_notes: Dict[str, str] = field(default_factory=dict)
     github: Optional[GitHubSettings] = None
     ready_status: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    # The ready_status dict last normalized for each stage. The checklist
+    # helpers only write valid states for listed items, so that dict stays
+    # normalized for as long as it is still the one stored in ready_status.
+    _normalized: Dict[str, Dict[str, str]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self) -> None:
-        unknown = set(self.stage_status) - set(STAGE_ORDER)
-        if unknown:  # pragma: no cover - defensive check
-            raise ValueError(f"Unknown stage keys in state: {sorted(unknown)}")
-        for key, status in list(self.stage_status.items()):
+        for key, status in self.stage_status.items():
+            if key not in STAGE_INDEX:  # pragma: no cover - defensive check
+                unknown = sorted(stage for stage in self.stage_status if stage not in STAGE_INDEX)
+                raise ValueError(f"Unknown stage keys in state: {unknown}")
             if status not in VALID_STATUSES:
                 raise ValueError(f"Invalid status '{status}' for stage '{key}'")
 
@@ -79,84 +95,115 @@ class PipelineState:
 
     @classmethod
     def from_dict(cls, data: Dict[str, object]) -> "PipelineState":
-        return cls(
-            project_name=str(data["project_name"]),
-            concept=str(data["concept"]),
-            model=str(data["model"]),
-            stage_status=dict(data.get("stage_status", {})),
-            stage_notes=dict(data.get("stage_notes", {})),
-            github=GitHubSettings.from_dict(data["github"]) if data.get("github") else None,
-            ready_status={
-                stage: {
-                    item: str(status)
+        # data comes straight from json.loads and is not shared, so its nested
+        # dicts are adopted as-is instead of being copied. stage_status and
+        # ready_status are the exception: their keys and statuses are interned
+        # so later lookups and comparisons against the stage definitions
+        # short-circuit on identity.
+        stage_status = data.get("stage_status")
+        if isinstance(stage_status, dict):
+            stage_status = {
+                sys.intern(stage): sys.intern(status) if isinstance(status, str) else status
+                for stage, status in stage_status.items()
+            }
+        else:
+            stage_status = {}
+        stage_notes = data.get("stage_notes")
+        github = data.get("github")
+        ready_status = data.get("ready_status")
+        if isinstance(ready_status, dict):
+            valid_ready = VALID_READY_STATES
+            ready_status = {
+                sys.intern(stage): {
+                    sys.intern(item): sys.intern(status)
                     for item, status in items.items()
-                    if str(status) in VALID_READY_STATES
+                    if isinstance(status, str) and status in valid_ready
                 }
-                for stage, items in dict(data.get("ready_status", {})).items()
-            },
+                for stage, items in ready_status.items()
+            }
+        else:
+            ready_status = {}
+        return cls(
+            project_name=data["project_name"],
+            concept=data["concept"],
+            model=data["model"],
+            stage_status=stage_status,
+            stage_notes=stage_notes if isinstance(stage_notes, dict) else {},
+            github=GitHubSettings.from_dict(github) if github else None,
+            ready_status=ready_status,
         )
 
     def set_status(self, stage: str, status: str) -> None:
         if status not in VALID_STATUSES:
             raise ValueError(f"Invalid status '{status}'")
-        self.stage_status[stage] = status
+        self.stage_status[sys.intern(stage)] = sys.intern(status)
 
     def get_status(self, stage: str) -> str:
         return self.stage_status.get(stage, "pending")
 
     # Ready checklist helpers ----------------------------------------------
 
-    def _ensure_checklist_slot(self, stage: str) -> Dict[str, str]:
+    # Public methods resolve the Stage once and hand it down, rather than each
+    # helper repeating the get_stage() lookup.
+    def _ensure_checklist_slot(self, stage_def: Stage) -> Dict[str, str]:
         """Return the ready checklist mapping for a stage, initializing defaults."""
 
-        stage_def = get_stage(stage)
+        stage = stage_def.key
+        # get() rather than setdefault(stage, {}), which builds a throwaway
+        # dict on every call once the slot exists.
+        stored = self.ready_status.get(stage)
         if not stage_def.ready_checklist:
-            return self.ready_status.setdefault(stage, {})
-
-        stored = self.ready_status.setdefault(stage, {})
-        normalized: Dict[str, str] = {}
-        for item in stage_def.ready_checklist:
-            value = stored.get(item, "todo")
-            if value not in VALID_READY_STATES:
-                value = "todo"
-            normalized[item] = value
-        self.ready_status[stage] = normalized
-        return normalized
+            if stored is None:
+                stored = self.ready_status[stage] = {}
+            return stored
+
+        if stored is not None and self._normalized.get(stage) is stored:
+            return stored
+        if stored is None:
+            stored = {}
+        # A missing item reads as None, which is not a valid state either.
+        normalized = {
+            item: value if (value := stored.get(item)) in VALID_READY_STATES else "todo"
+            for item in stage_def.ready_checklist
+        }
+        if normalized != stored:
+            self.ready_status[stage] = stored = normalized
+        self._normalized[stage] = stored
+        return stored
 
     def get_ready_status(self, stage: str) -> Dict[str, str]:
         """Expose the ready checklist state for a stage."""
 
-        return self._ensure_checklist_slot(stage)
+        return self._ensure_checklist_slot(get_stage(stage))
 
     def update_ready_item(self, stage: str, item: str, status: str) -> None:
         if status not in VALID_READY_STATES:
             raise ValueError(f"Invalid ready status '{status}'")
-        mapping = self._ensure_checklist_slot(stage)
         stage_def = get_stage(stage)
+        mapping = self._ensure_checklist_slot(stage_def)
         if stage_def.ready_checklist and item not in stage_def.ready_checklist:
             raise KeyError(f"Item '{item}' is not part of the ready checklist for stage '{stage}'.")
-        mapping[item] = status
+        mapping[sys.intern(item)] = sys.intern(status)
 
     def reset_ready(self, stage: str) -> None:
-        mapping = self._ensure_checklist_slot(stage)
-        for item in list(mapping):
-            mapping[item] = "todo"
+        mapping = self._ensure_checklist_slot(get_stage(stage))
+        # Only values change, so the existing keys can feed the update directly.
+        mapping.update(dict.fromkeys(mapping, "todo"))
 
     def is_ready_complete(self, stage: str) -> bool:
         stage_def = get_stage(stage)
         if not stage_def.ready_checklist:
             return True
-        mapping = self._ensure_checklist_slot(stage)
+        mapping = self._ensure_checklist_slot(stage_def)
         return all(mapping.get(item) == "pass" for item in stage_def.ready_checklist)
 
     def ensure_ready(self, stage: str) -> None:
         stage_def = get_stage(stage)
         if not stage_def.ready_checklist:
             return
-        if not self.is_ready_complete(stage):
-            remaining = [
-                item for item in stage_def.ready_checklist if self.ready_status[stage][item] != "pass"
-            ]
+        mapping = self._ensure_checklist_slot(stage_def)
+        remaining = [item for item in stage_def.ready_checklist if mapping[item] != "pass"]
+        if remaining:
             raise RuntimeError(
                 "Ready checklist incomplete for stage '{stage}'. Remaining items: {items}".format(
                     stage=stage_def.title,
@@ -168,11 +215,11 @@ class PipelineState:
         """Ensure that all preceding stages are complete before moving forward."""
 
         try:
-            index = STAGE_ORDER.index(target_stage)
-        except ValueError as exc:  # pragma: no cover - defensive
+            prior = _PRIOR_STAGES[target_stage]
+        except KeyError as exc:  # pragma: no cover - defensive
             raise ValueError(f"Unknown stage '{target_stage}'") from exc
-        prior = STAGE_ORDER[:index]
-        blockers = [stage for stage in prior if self.get_status(stage) != "complete"]
+        statuses = self.stage_status
+        blockers = [stage for stage in prior if statuses.get(stage, "pending") != "complete"]
         if blockers:
             raise RuntimeError(
                 "Cannot advance stage '{stage}' until these stages are complete: {blockers}".format(
@@ -185,41 +232,190 @@ class PipelineState:
         self.ensure_ready(stage)
         self.set_status(stage, "complete")
 
-    def list_statuses(self) -> Iterable[tuple[str, str]]:
-        for stage in STAGE_ORDER:
-            yield stage, self.get_status(stage)
+    def list_statuses(self) -> Tuple[Tuple[str, str], ...]:
+        statuses = self.stage_status
+        return tuple((stage, statuses.get(stage, "pending")) for stage in STAGE_ORDER)
 
 
 class StateManager:
     """Handles reading and writing state to disk."""
 
     def __init__(self, root: Path | None = None) -> None:
-        default_root = Path(__file__).resolve().parents[1]
-        self.root = Path(root) if root is not None else default_root
+        self.root = Path(root) if root is not None else _DEFAULT_ROOT
         self.state_dir = self.root / ".codex_pipeline"
         self.state_path = self.state_dir / "state.json"
+        self._transaction_depth = 0
+        self._pending: Optional[PipelineState] = None
+        self._last_payload_hash: Optional[bytes] = None
+        self._cached_state: Optional[PipelineState] = None
+        # (st_mtime_ns, st_size) of the file _cached_state was read from or written to.
+        self._cached_stamp: Optional[Tuple[int, int]] = None
+        self._dir_ready = False
 
     # General utilities -------------------------------------------------
 
     def exists(self) -> bool:
-        return self.state_path.exists()
+        if self.state_path.exists():
+            self._dir_ready = True
+            return True
+        return False
 
     def ensure_initialized(self) -> None:
-        if not self.exists():
-            raise RuntimeError(
-                "Pipeline not initialized. Run 'python -m codex.pipeline_cli init' first."
-            )
+        if self._cached_state is None and not self.exists():
+            raise RuntimeError(_NOT_INITIALIZED)
 
     # Load/save ---------------------------------------------------------
 
     def load(self) -> PipelineState:
-        self.ensure_initialized()
-        data = json.loads(self.state_path.read_text())
-        return PipelineState.from_dict(data)
+        # An open transaction holds changes the file does not have yet.
+        if self._pending is not None:
+            return self._pending
+        try:
+            stat = os.stat(self.state_path)
+        except FileNotFoundError:
+            raise RuntimeError(_NOT_INITIALIZED) from None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        # Reuse the parsed state until something else rewrites the file.
+        if self._cached_state is not None and stamp == self._cached_stamp:
+            return self._cached_state
+        try:
+            payload = self.state_path.read_bytes()
+        except FileNotFoundError:
+            raise RuntimeError(_NOT_INITIALIZED) from None
+        self._dir_ready = True
+        self._cached_stamp = stamp
+        self._last_payload_hash = _payload_hash(payload)
+        self._cached_state = PipelineState.from_dict(_decode_payload(payload))
+        return self._cached_state
 
     def save(self, state: PipelineState) -> None:
-        self.state_dir.mkdir(parents=True, exist_ok=True)
-        self.state_path.write_text(json.dumps(state.to_dict(), indent=2))
+        if self._transaction_depth:
+            self._pending = state
+            return
+        self._commit(state)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Coalesce every save() inside the block into a single write on exit."""
+
+        self._transaction_depth += 1
+        try:
+            yield
+        finally:
+            self._transaction_depth -= 1
+            if not self._transaction_depth and self._pending is not None:
+                state, self._pending = self._pending, None
+                self._commit(state)
+
+    def _commit(self, state: PipelineState) -> None:
+        """Write state, caching it only once the write has succeeded."""
+
+        try:
+            self._write(state)
+        except BaseException:
+            # Callers mutate the loaded object in place, so the cache may hold
+            # the unsaved state; drop it so load() re-reads what is on disk.
+            self._cached_state = None
+            self._cached_stamp = None
+            raise
+        self._cached_state = state
+
+    def _write(self, state: PipelineState) -> None:
+        payload = _encode_payload(state.to_dict())
+        payload_hash = _payload_hash(payload)
+        # Nothing changed since the last load or write; skip the fsync.
+        if payload_hash == self._last_payload_hash and self.exists():
+            return
+        # Write a sibling file and swap it in so readers never see a partial state.
+        if not self._dir_ready:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        # A per-process name keeps concurrent CLI runs from writing into each
+        # other's temp file; the last replace wins with a complete file.
+        temp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+        # Write through a raw descriptor: no buffered file object, one write call.
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+                # os.replace keeps the inode and mtime, so this is the published file's stamp.
+                stat = os.fstat(fd)
+            finally:
+                os.close(fd)
+            os.replace(temp_path, self.state_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        # The rename is atomic; flushing the directory entry as well only buys
+        # durability across power loss, so it is opt-in.
+        if os.environ.get("CODEX_STRICT_DURABILITY") == "1" and hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(self.state_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self._last_payload_hash = payload_hash
+        self._cached_stamp = (stat.st_mtime_ns, stat.st_size)
+
+
+# The JSON codecs are imported on first load or save, so commands that never
+# touch state (--help, argument errors) skip the import cost.
+@lru_cache(maxsize=None)
+def _orjson():
+    try:  # Optional fast JSON codec; the standard library is the fallback.
+        import orjson
+    except ImportError:  # pragma: no cover - fall back to the standard library
+        return None
+    return orjson
+
+
+@lru_cache(maxsize=None)
+def _json_encoder():
+    import json
+
+    # json.dumps() builds a fresh JSONEncoder whenever it is given options,
+    # so keep one for the standard-library fallback.
+    return json.JSONEncoder(indent=2)
+
+
+# json.dumps() escapes DEL and non-ASCII text as \uXXXX; orjson writes them raw.
+_UNESCAPED_RE = re.compile(r"[^\x00-\x7e]")
+
+
+def _escape_unescaped(match: "re.Match[str]") -> str:
+    code = ord(match.group())
+    if code < 0x10000:
+        return f"\\u{code:04x}"
+    code -= 0x10000
+    return f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}"
+
+
+def _encode_payload(data: Dict[str, object]) -> bytes:
+    orjson = _orjson()
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        if payload.isascii() and b"\x7f" not in payload:
+            return payload
+        # Escape the same way as the standard-library encoder so state.json
+        # bytes do not depend on whether orjson is installed.
+        return _UNESCAPED_RE.sub(_escape_unescaped, payload.decode("utf-8")).encode("ascii")
+    return _json_encoder().encode(data).encode("utf-8")
+
+
+def _decode_payload(payload: bytes) -> Dict[str, object]:
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.loads(payload)
+    import json
+
+    return json.loads(payload)
+
+
+def _payload_hash(payload: bytes) -> bytes:
+    return hashlib.blake2b(payload, digest_size=16).digest()
 
 
 __all__ = [